@@ -2,9 +2,124 @@
 Generate sample ADS-B data for testing
 Creates CSV file with simulated transponder readings
 """
+import csv
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+
+# Aircraft patterns
+PATTERNS = [
+    "circling",
+    "linear",
+    "approach",
+    "departure",
+    "hovering"
+]
+
+# Below this many aircraft, process startup costs more than it saves
+_PARALLEL_THRESHOLD = 8
+
+
+def _circling_traj(rng, t, start_x, start_y, altitude_ft, base_speed_kt):
+    """Circular pattern"""
+    radius = 1000
+    angular_speed = 0.1  # rad/s
+    x = start_x + radius * np.cos(angular_speed * t)
+    y = start_y + radius * np.sin(angular_speed * t)
+    altitude = np.full(t.shape, altitude_ft, dtype=float)
+    speed_kt = np.full(t.shape, base_speed_kt, dtype=float)
+    return x, y, altitude, speed_kt
+
+
+def _linear_traj(rng, t, start_x, start_y, altitude_ft, base_speed_kt):
+    """Straight line with constant velocity"""
+    velocity_x = rng.uniform(-50, 50)
+    velocity_y = rng.uniform(-50, 50)
+    x = start_x + velocity_x * t
+    y = start_y + velocity_y * t
+    altitude = np.full(t.shape, altitude_ft, dtype=float)
+    speed_kt = base_speed_kt + rng.uniform(-20, 20, t.shape)
+    return x, y, altitude, speed_kt
+
+
+def _approach_traj(rng, t, start_x, start_y, altitude_ft, base_speed_kt):
+    """Landing approach (descending)"""
+    x = start_x - 30 * t  # Approaching
+    y = np.full(t.shape, start_y)
+    altitude = np.clip(altitude_ft - 50 * t, 0, None)
+    speed_kt = np.clip(base_speed_kt - 5 * t, 100, None)
+    return x, y, altitude, speed_kt
+
+
+def _departure_traj(rng, t, start_x, start_y, altitude_ft, base_speed_kt):
+    """Takeoff (ascending)"""
+    x = start_x + 40 * t
+    y = np.full(t.shape, start_y)
+    altitude = np.clip(altitude_ft + 100 * t, None, 30000)
+    speed_kt = np.clip(base_speed_kt + 10 * t, None, 500)
+    return x, y, altitude, speed_kt
+
+
+def _hovering_traj(rng, t, start_x, start_y, altitude_ft, base_speed_kt):
+    """Hovering drone with slight drift"""
+    drift = rng.normal(0, 10, size=(t.shape[0], 2))
+    x = start_x + drift[:, 0]
+    y = start_y + drift[:, 1]
+    altitude = np.full(t.shape, min(500, altitude_ft), dtype=float)
+    speed_kt = rng.uniform(0, 30, t.shape)
+    return x, y, altitude, speed_kt
+
+
+# One branch per aircraft instead of a string-compare chain per trajectory
+_PATTERN_FNS = {
+    "circling": _circling_traj,
+    "linear": _linear_traj,
+    "approach": _approach_traj,
+    "departure": _departure_traj,
+    "hovering": _hovering_traj
+}
+
+
+def _gen_trajectory(args):
+    """
+    Generate one aircraft's full trajectory as column arrays.
+
+    Runs in a worker process; each aircraft gets its own spawned seed so
+    results are independent regardless of scheduling order.
+
+    Returns:
+        (pattern, x, y, altitude, speed, heading) arrays/str
+    """
+    seed, num_updates, update_rate_hz = args
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_updates) / update_rate_hz
+
+    pattern = rng.choice(PATTERNS)
+
+    # Random initial position (world coordinates in meters)
+    start_x = rng.uniform(-5000, 5000)
+    start_y = rng.uniform(-5000, 5000)
+
+    # Random altitude and speed
+    altitude_ft = rng.integers(500, 30000)
+    base_speed_kt = rng.integers(150, 500)
+
+    # Generate trajectory via the per-pattern dispatch table
+    x, y, altitude, speed_kt = _PATTERN_FNS[pattern](
+        rng, t, start_x, start_y, altitude_ft, base_speed_kt
+    )
+
+    # Add noise
+    noise = rng.normal(0, 5, size=(num_updates, 2))
+    x = x + noise[:, 0]
+    y = y + noise[:, 1]
+
+    heading = rng.uniform(0, 360, num_updates).astype(int)
+
+    return pattern, x, y, altitude, speed_kt, heading
 
 
 def generate_sample_adsb(
@@ -23,107 +138,73 @@ def generate_sample_adsb(
         update_rate_hz: Update frequency (Hz)
     """
     print(f"Generating ADS-B data for {num_aircraft} aircraft over {duration_seconds}s")
-    
-    records = []
+
     start_time = datetime.now()
-    
-    # Aircraft patterns
-    patterns = [
-        "circling",
-        "linear",
-        "approach",
-        "departure",
-        "hovering"
-    ]
-    
-    for aircraft_id in range(num_aircraft):
-        transponder_id = f"AC{aircraft_id:04d}"
-        pattern = np.random.choice(patterns)
-        
-        # Random initial position (world coordinates in meters)
-        start_x = np.random.uniform(-5000, 5000)
-        start_y = np.random.uniform(-5000, 5000)
-        
-        # Random altitude and speed
-        altitude_ft = np.random.randint(500, 30000)
-        base_speed_kt = np.random.randint(150, 500)
-        
-        # Generate trajectory based on pattern
-        num_updates = int(duration_seconds * update_rate_hz)
-        
-        for i in range(num_updates):
-            timestamp = start_time + timedelta(seconds=i / update_rate_hz)
-            t = i / update_rate_hz
-            
-            if pattern == "circling":
-                # Circular pattern
-                radius = 1000
-                angular_speed = 0.1  # rad/s
-                x = start_x + radius * np.cos(angular_speed * t)
-                y = start_y + radius * np.sin(angular_speed * t)
-                speed_kt = base_speed_kt
-                
-            elif pattern == "linear":
-                # Straight line
-                velocity_x = np.random.uniform(-50, 50)
-                velocity_y = np.random.uniform(-50, 50)
-                x = start_x + velocity_x * t
-                y = start_y + velocity_y * t
-                speed_kt = base_speed_kt + np.random.uniform(-20, 20)
-                
-            elif pattern == "approach":
-                # Landing approach (descending)
-                x = start_x - 30 * t  # Approaching
-                y = start_y
-                altitude_ft = max(0, altitude_ft - 50 * t)
-                speed_kt = max(100, base_speed_kt - 5 * t)
-                
-            elif pattern == "departure":
-                # Takeoff (ascending)
-                x = start_x + 40 * t
-                y = start_y
-                altitude_ft = min(30000, altitude_ft + 100 * t)
-                speed_kt = min(500, base_speed_kt + 10 * t)
-                
-            else:  # hovering (drone)
-                # Slight drift
-                x = start_x + np.random.normal(0, 10)
-                y = start_y + np.random.normal(0, 10)
-                altitude_ft = min(500, altitude_ft)
-                speed_kt = np.random.uniform(0, 30)
-            
-            # Add noise
-            x += np.random.normal(0, 5)
-            y += np.random.normal(0, 5)
-            
-            records.append({
-                'timestamp': timestamp.isoformat(),
-                'transponder_id': transponder_id,
-                'x': round(x, 2),
-                'y': round(y, 2),
-                'altitude': int(altitude_ft),
-                'speed': int(speed_kt),
-                'heading': int(np.random.uniform(0, 360)),
-                'pattern': pattern
-            })
-    
-    # Create DataFrame
-    df = pd.DataFrame(records)
-    
-    # Sort by timestamp
-    df = df.sort_values('timestamp')
-    
+
+    # Shared time axis for every aircraft (seconds since start)
+    num_updates = int(duration_seconds * update_rate_hz)
+    t = np.arange(num_updates) / update_rate_hz
+
+    # Trajectories are independent: fan out across cores for larger fleets,
+    # stay serial for small ones where process startup dominates
+    seeds = np.random.SeedSequence().spawn(num_aircraft)
+    worker_args = [(seed, num_updates, update_rate_hz) for seed in seeds]
+
+    if num_aircraft >= _PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_gen_trajectory, worker_args))
+    else:
+        results = [_gen_trajectory(args) for args in worker_args]
+
+    aircraft_patterns = [r[0] for r in results]
+    x_cols = [r[1] for r in results]
+    y_cols = [r[2] for r in results]
+    altitude_cols = [r[3] for r in results]
+    speed_cols = [r[4] for r in results]
+    heading_cols = [r[5] for r in results]
+
+    # Stack per-aircraft columns as (num_updates, num_aircraft) matrices.
+    # All aircraft share the same time grid, so writing one row per aircraft
+    # per timestep streams the CSV already time-sorted — no DataFrame or
+    # sort_values round-trip needed.
+    x_mat = np.round(np.stack(x_cols, axis=1), 2)
+    y_mat = np.round(np.stack(y_cols, axis=1), 2)
+    altitude_mat = np.stack(altitude_cols, axis=1).astype(int)
+    speed_mat = np.stack(speed_cols, axis=1).astype(int)
+    heading_mat = np.stack(heading_cols, axis=1)
+
+    timestamps = (pd.to_datetime(start_time) + pd.to_timedelta(t, unit='s')).astype(str)
+    transponder_ids = [f"AC{i:04d}" for i in range(num_aircraft)]
+
     # Save to CSV
     from pathlib import Path
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, index=False)
-    
-    print(f"✓ Generated {len(records)} ADS-B records")
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            'timestamp', 'transponder_id', 'x', 'y',
+            'altitude', 'speed', 'heading', 'pattern'
+        ])
+        # Raveling the (num_updates, num_aircraft) matrices in C order walks
+        # time-outer, aircraft-inner: one writerows call emits the whole
+        # table already time-sorted
+        writer.writerows(zip(
+            np.repeat(timestamps, num_aircraft),
+            transponder_ids * num_updates,
+            x_mat.ravel(),
+            y_mat.ravel(),
+            altitude_mat.ravel(),
+            speed_mat.ravel(),
+            heading_mat.ravel(),
+            aircraft_patterns * num_updates
+        ))
+
+    print(f"✓ Generated {num_aircraft * num_updates} ADS-B records")
     print(f"✓ Saved to {output_path}")
+    pattern_counts = Counter(aircraft_patterns)
     print(f"\nAircraft breakdown:")
-    for pattern in patterns:
-        count = len(df[df['pattern'] == pattern]['transponder_id'].unique())
-        print(f"  {pattern}: {count} aircraft")
+    for pattern in PATTERNS:
+        print(f"  {pattern}: {pattern_counts[pattern]} aircraft")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
 """
 ADS-B data simulator and matcher
 """
+import csv
+
 import pandas as pd
 import numpy as np
+from numba import njit
 from typing import Optional, Dict, Tuple
 from pathlib import Path
 import logging
@@ -11,6 +14,32 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True, fastmath=True)
+def _find_nearest(ts, xs, ys, t0, x0, y0, max_t, max_r2):
+    """
+    Single-pass argmin over the ADS-B arrays: nearest record to (x0, y0)
+    within the time window. Returns (best_idx, best_d2, best_dt), with
+    best_idx == -1 when nothing matches.
+    """
+    best_idx = -1
+    best_d2 = 0.0
+    best_dt = 0.0
+    for i in range(ts.shape[0]):
+        dt = abs(ts[i] - t0)
+        if dt > max_t:
+            continue
+        dx = xs[i] - x0
+        dy = ys[i] - y0
+        d2 = dx * dx + dy * dy
+        if d2 > max_r2:
+            continue
+        if best_idx == -1 or d2 < best_d2:
+            best_idx = i
+            best_d2 = d2
+            best_dt = dt
+    return best_idx, best_d2, best_dt
+
+
 class ADSBSimulator:
     """ADS-B data simulator and spatio-temporal matcher"""
     
@@ -33,6 +62,10 @@ class ADSBSimulator:
         self.match_time_s = match_time_s
         
         self.data = None
+        self._ts = None
+        self._x = None
+        self._y = None
+        self._tid = None
         self.enabled = False
         
         if csv_path and Path(csv_path).exists():
@@ -52,9 +85,19 @@ class ADSBSimulator:
                     return
             
             # Convert timestamp to numeric if needed
-            if self.data['timestamp'].dtype == 'object':
+            if not pd.api.types.is_numeric_dtype(self.data['timestamp']):
                 self.data['timestamp'] = pd.to_datetime(self.data['timestamp']).astype(int) / 10**9
-            
+
+            # Keep records time-sorted so queries can binary-search the
+            # time window instead of scanning the whole table
+            self.data = self.data.sort_values('timestamp', ignore_index=True)
+
+            # Cache raw column arrays for the numba search kernel
+            self._ts = self.data['timestamp'].to_numpy(np.float64)
+            self._x = self.data['x'].to_numpy(np.float64)
+            self._y = self.data['y'].to_numpy(np.float64)
+            self._tid = self.data['transponder_id'].to_numpy()
+
             self.enabled = True
             logger.info(f"Loaded {len(self.data)} ADS-B records from {self.csv_path}")
             
@@ -95,41 +138,38 @@ class ADSBSimulator:
         max_time = max_time_s or self.match_time_s
         
         x, y = world_pos
-        
-        # Filter by time window
-        time_mask = np.abs(self.data['timestamp'] - timestamp) <= max_time
-        candidates = self.data[time_mask]
-        
-        if len(candidates) == 0:
+
+        # Binary-search the time window, then scan only that slice
+        lo = np.searchsorted(self._ts, timestamp - max_time, side='left')
+        hi = np.searchsorted(self._ts, timestamp + max_time, side='right')
+        if lo >= hi:
             return None
-        
-        # Compute distances
-        distances = np.sqrt(
-            (candidates['x'] - x) ** 2 +
-            (candidates['y'] - y) ** 2
+
+        idx, best_d2, best_dt = _find_nearest(
+            self._ts[lo:hi], self._x[lo:hi], self._y[lo:hi],
+            float(timestamp), float(x), float(y),
+            float(max_time), float(max_radius) ** 2
         )
-        
-        # Find nearest within radius
-        within_radius = distances <= max_radius
-        if not within_radius.any():
+
+        if idx < 0:
             return None
-        
-        idx = distances[within_radius].idxmin()
-        match = candidates.loc[idx]
-        
+        idx += lo
+
+        match = self.data.iloc[idx]
+
         # Build result
         result = {
-            'transponder_id': str(match['transponder_id']),
-            'match_distance_m': float(distances.loc[idx]),
-            'match_time_diff_s': float(abs(match['timestamp'] - timestamp))
+            'transponder_id': str(self._tid[idx]),
+            'match_distance_m': float(np.sqrt(best_d2)),
+            'match_time_diff_s': float(best_dt)
         }
-        
+
         # Add optional fields
         if 'altitude' in match:
             result['altitude'] = float(match['altitude'])
         if 'speed' in match:
             result['speed'] = float(match['speed'])
-        
+
         return result
     
     @staticmethod
@@ -141,21 +181,24 @@ class ADSBSimulator:
             output_path: Output CSV file path
             num_records: Number of records to generate
         """
-        # Generate synthetic data
+        # Generate synthetic data (single PCG64 generator, batched draws)
+        rng = np.random.default_rng()
         timestamps = np.linspace(0, 600, num_records)  # 10 minutes
-        
-        data = {
-            'timestamp': timestamps,
-            'transponder_id': [f"TEST-{i%5}" for i in range(num_records)],
-            'x': np.random.uniform(-1000, 1000, num_records),
-            'y': np.random.uniform(-1000, 1000, num_records),
-            'altitude': np.random.uniform(1000, 40000, num_records),
-            'speed': np.random.uniform(100, 500, num_records)
-        }
-        
-        df = pd.DataFrame(data)
-        df.to_csv(output_path, index=False)
-        
+
+        # Mixed str/float columns, so stream through csv.writer directly —
+        # no DataFrame allocation or dtype inference pass
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'transponder_id', 'x', 'y', 'altitude', 'speed'])
+            writer.writerows(zip(
+                timestamps,
+                (f"TEST-{i % 5}" for i in range(num_records)),
+                rng.uniform(-1000, 1000, num_records),
+                rng.uniform(-1000, 1000, num_records),
+                rng.uniform(1000, 40000, num_records),
+                rng.uniform(100, 500, num_records)
+            ))
+
         logger.info(f"Created sample ADS-B CSV with {num_records} records: {output_path}")
 
 
@@ -2,13 +2,19 @@
 FastAPI server for aircraft detection system
 Provides REST API and WebSocket endpoints for real-time alerts
 """
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, Security
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, Depends, Security
 from fastapi.security.api_key import APIKeyHeader
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-import json
+from fastapi.middleware.gzip import GZipMiddleware
 import asyncio
+import hashlib
+import threading
+
+import aiofiles
+import orjson
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional
 import cv2
@@ -25,7 +31,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Aircraft Detection API",
     description="REST API and WebSocket server for aircraft detection system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Mount static files
@@ -34,6 +41,8 @@ if static_path.exists():
     app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
 
 # CORS middleware
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -55,6 +64,67 @@ detection_logs: List[Dict] = []
 video_path: Optional[str] = None
 websocket_clients: List[WebSocket] = []
 
+# Inverted log indexes, built once at startup (indexes into detection_logs)
+logs_by_frame: Dict[int, List[int]] = {}
+logs_by_threat: Dict[str, List[int]] = {}
+logs_summary: Optional[Dict] = None
+logs_etag: Optional[str] = None
+
+
+def _build_log_indexes():
+    """One pass over detection_logs: frame/threat indexes + summary stats."""
+    global logs_by_frame, logs_by_threat, logs_summary, logs_etag
+
+    logs_etag = hashlib.md5(orjson.dumps(detection_logs)).hexdigest()
+
+    logs_by_frame = {}
+    logs_by_threat = {}
+
+    threat_counts = {"Low": 0, "Medium": 0, "High": 0, "Critical": 0}
+    class_counts = {}
+    unique_tracks = set()
+
+    for i, log in enumerate(detection_logs):
+        logs_by_frame.setdefault(log['frame'], []).append(i)
+
+        level = log['threat']['level']
+        logs_by_threat.setdefault(level, []).append(i)
+        threat_counts[level] += 1
+
+        class_label = log['class_label']
+        class_counts[class_label] = class_counts.get(class_label, 0) + 1
+
+        unique_tracks.add(log['id'])
+
+    logs_summary = {
+        "total_detections": len(detection_logs),
+        "unique_tracks": len(unique_tracks),
+        "threat_distribution": threat_counts,
+        "class_distribution": class_counts
+    } if detection_logs else None
+
+# Pooled video capture for /frame, shared across requests
+_video_capture: Optional[cv2.VideoCapture] = None
+_video_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _get_jpeg(frame_number: int) -> Optional[bytes]:
+    """Decode and JPEG-encode a frame via the pooled capture (cached)."""
+    global _video_capture
+
+    with _video_lock:
+        if _video_capture is None:
+            _video_capture = cv2.VideoCapture(video_path)
+        _video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        ret, frame = _video_capture.read()
+
+    if not ret:
+        return None
+
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return buffer.tobytes() if ok else None
+
 
 def get_api_key(api_key: str = Security(api_key_header)):
     """Validate API key"""
@@ -76,6 +146,9 @@ async def startup_event():
     )
     
     logger.info("Starting Aircraft Detection API Server")
+
+    # Keep OpenCV off the uvicorn worker threads
+    cv2.setNumThreads(1)
     
     # Load detection logs
     output_config = config.get_section('output')
@@ -83,18 +156,34 @@ async def startup_event():
     
     try:
         if Path(logs_file).exists():
-            with open(logs_file, 'r') as f:
-                detection_logs = json.load(f)
+            async with aiofiles.open(logs_file, 'rb') as f:
+                raw = await f.read()
+            try:
+                # Legacy single-array format
+                detection_logs = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                # JSON-lines stream written by the pipeline
+                detection_logs = [
+                    orjson.loads(line) for line in raw.splitlines() if line.strip()
+                ]
             logger.info(f"Loaded {len(detection_logs)} detection logs from {logs_file}")
         else:
             logger.warning(f"Logs file not found: {logs_file}")
     except Exception as e:
         logger.error(f"Error loading logs: {e}")
-    
+
+    # Build lookup indexes once so the query endpoints avoid full scans
+    _build_log_indexes()
+
     # Get video path
     video_config = config.get_section('video')
     video_path = video_config.get('output_path', 'outputs/annotated_video.mp4')
-    
+
+    # Prewarm the pooled capture in the background so the first /frame
+    # request doesn't pay the cold-open + seek cost
+    if Path(video_path).exists():
+        asyncio.get_running_loop().run_in_executor(None, _get_jpeg, 0)
+
     logger.info(f"API server ready on port {server_config.get('port', 8000)}")
 
 
@@ -129,6 +218,8 @@ async def api_status():
 
 @app.get("/logs")
 async def get_logs(
+    request: Request,
+    response: Response,
     api_key: str = Depends(get_api_key),
     frame: Optional[int] = None,
     threat_level: Optional[str] = None,
@@ -145,19 +236,27 @@ async def get_logs(
     Returns:
         Filtered detection logs
     """
-    filtered_logs = detection_logs
-    
-    # Filter by frame
-    if frame is not None:
-        filtered_logs = [log for log in filtered_logs if log['frame'] == frame]
-    
-    # Filter by threat level
     if threat_level:
         valid_levels = ['Low', 'Medium', 'High', 'Critical']
         if threat_level not in valid_levels:
             raise HTTPException(status_code=400, detail=f"Invalid threat level. Must be one of: {valid_levels}")
-        filtered_logs = [log for log in filtered_logs if log['threat']['level'] == threat_level]
-    
+
+    # Logs are immutable after startup: a matching ETag means the client
+    # already has this exact response
+    if request.headers.get('if-none-match') == logs_etag:
+        return Response(status_code=304)
+    response.headers['ETag'] = logs_etag
+
+    # Resolve through the inverted indexes instead of scanning all logs
+    if frame is not None:
+        filtered_logs = [detection_logs[i] for i in logs_by_frame.get(frame, [])]
+        if threat_level:
+            filtered_logs = [log for log in filtered_logs if log['threat']['level'] == threat_level]
+    elif threat_level:
+        filtered_logs = [detection_logs[i] for i in logs_by_threat.get(threat_level, [])]
+    else:
+        filtered_logs = detection_logs
+
     # Apply limit
     if limit:
         filtered_logs = filtered_logs[:limit]
@@ -169,35 +268,25 @@ async def get_logs(
 
 
 @app.get("/logs/summary")
-async def get_logs_summary(api_key: str = Depends(get_api_key)):
+async def get_logs_summary(
+    request: Request,
+    response: Response,
+    api_key: str = Depends(get_api_key)
+):
     """
     Get summary statistics from detection logs
-    
+
     Returns:
         Summary statistics
     """
-    if not detection_logs:
+    if logs_summary is None:
         return {"error": "No logs available"}
-    
-    # Count by threat level
-    threat_counts = {"Low": 0, "Medium": 0, "High": 0, "Critical": 0}
-    class_counts = {}
-    unique_tracks = set()
-    
-    for log in detection_logs:
-        threat_counts[log['threat']['level']] += 1
-        
-        class_label = log['class_label']
-        class_counts[class_label] = class_counts.get(class_label, 0) + 1
-        
-        unique_tracks.add(log['id'])
-    
-    return {
-        "total_detections": len(detection_logs),
-        "unique_tracks": len(unique_tracks),
-        "threat_distribution": threat_counts,
-        "class_distribution": class_counts
-    }
+
+    if request.headers.get('if-none-match') == logs_etag:
+        return Response(status_code=304)
+    response.headers['ETag'] = logs_etag
+
+    return logs_summary
 
 
 @app.get("/frame/{frame_number}")
@@ -213,24 +302,18 @@ async def get_frame(frame_number: int, api_key: str = Depends(get_api_key)):
     """
     if not video_path or not Path(video_path).exists():
         raise HTTPException(status_code=404, detail="Annotated video not found")
-    
-    # Open video
-    cap = cv2.VideoCapture(video_path)
-    
-    # Seek to frame
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-    ret, frame = cap.read()
-    cap.release()
-    
-    if not ret:
+
+    # Decode off the event loop; repeated frames come straight from the cache
+    loop = asyncio.get_running_loop()
+    jpeg = await loop.run_in_executor(None, _get_jpeg, frame_number)
+
+    if jpeg is None:
         raise HTTPException(status_code=404, detail=f"Frame {frame_number} not found")
-    
-    # Encode as JPEG
-    _, buffer = cv2.imencode('.jpg', frame)
-    
+
     return StreamingResponse(
-        iter([buffer.tobytes()]),
-        media_type="image/jpeg"
+        iter([jpeg]),
+        media_type="image/jpeg",
+        headers={"Cache-Control": "public, max-age=3600, immutable"}
     )
 
 
@@ -254,11 +337,14 @@ async def get_alerts(
         raise HTTPException(status_code=400, detail="Invalid threat level")
     
     min_priority = level_priority[min_level]
-    
-    alerts = [
-        log for log in detection_logs
-        if level_priority[log['threat']['level']] >= min_priority
-    ]
+
+    # Merge the per-level index lists, keeping original log order
+    alert_indexes = sorted(
+        i for level, priority in level_priority.items()
+        if priority >= min_priority
+        for i in logs_by_threat.get(level, [])
+    )
+    alerts = [detection_logs[i] for i in alert_indexes]
     
     return {
         "count": len(alerts),
@@ -277,18 +363,15 @@ async def websocket_alerts(websocket: WebSocket):
     logger.info("WebSocket client connected")
     
     try:
-        # Send existing High/Critical alerts
-        high_priority_logs = [
-            log for log in detection_logs
-            if log['threat']['level'] in ['High', 'Critical']
-        ]
-        
-        for log in high_priority_logs:
-            await websocket.send_json({
-                "type": "alert",
-                "data": log
-            })
-            await asyncio.sleep(0.1)  # Rate limiting
+        # Send existing High/Critical alerts in log order (pre-encoded, no
+        # per-alert delay so a cold client catches up immediately)
+        high_priority = sorted(
+            logs_by_threat.get('High', []) + logs_by_threat.get('Critical', [])
+        )
+        for i in high_priority:
+            await websocket.send_text(
+                orjson.dumps({"type": "alert", "data": detection_logs[i]}).decode()
+            )
         
         # Keep connection alive
         while True:
@@ -317,16 +400,22 @@ async def broadcast_alert(log: Dict):
     Args:
         log: Detection log entry
     """
-    if log['threat']['level'] in ['High', 'Critical']:
-        message = {"type": "alert", "data": log}
-        
-        # Send to all clients
-        for client in websocket_clients[:]:  # Copy to avoid modification during iteration
-            try:
-                await client.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send to client: {e}")
-                websocket_clients.remove(client)
+    if log['threat']['level'] in ['High', 'Critical'] and websocket_clients:
+        # Encode once, fan out concurrently (clients parse JSON text,
+        # see static/app.js)
+        payload = orjson.dumps({"type": "alert", "data": log}).decode()
+
+        clients = list(websocket_clients)
+        results = await asyncio.gather(
+            *(client.send_text(payload) for client in clients),
+            return_exceptions=True
+        )
+
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to send to client: {result}")
+                if client in websocket_clients:
+                    websocket_clients.remove(client)
 
 
 @app.get("/metrics")
@@ -344,8 +433,8 @@ async def get_metrics(api_key: str = Depends(get_api_key)):
         raise HTTPException(status_code=404, detail="Metrics file not found")
     
     try:
-        with open(metrics_file, 'r') as f:
-            metrics = json.load(f)
+        with open(metrics_file, 'rb') as f:
+            metrics = orjson.loads(f.read())
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading metrics: {str(e)}")
@@ -2,11 +2,17 @@
 Configuration loader for aircraft detection system
 """
 import yaml
+import pickle
 from pathlib import Path
 from typing import Any, Dict
 from dotenv import load_dotenv
 import os
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml, 10-20x faster
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class Config:
     """Configuration manager"""
@@ -20,42 +26,75 @@ class Config:
         """
         self.config_path = Path(config_path)
         load_dotenv()  # Load .env file
-        
+
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config file not found: {config_path}")
-        
+
+        self._load()
+
+    def _load(self):
+        """Parse the YAML (via pickle cache when fresh) and build the
+        flattened lookup table"""
+        self._config = self._read_config()
+
+        # Flatten once so get() is a single dict lookup instead of a
+        # split + nested walk + getenv per call
+        self._flat: Dict[str, Any] = {}
+        self._flatten(self._config, "")
+
+        # Resolve environment overrides once (DETECTOR_MODEL_PATH etc.)
+        for key in list(self._flat):
+            env_value = os.getenv(key.upper().replace('.', '_'))
+            if env_value is not None:
+                self._flat[key] = env_value
+
+    def _read_config(self) -> Dict[str, Any]:
+        """Load the config dict, preferring a pickle cache newer than the YAML"""
+        cache_path = self.config_path.with_suffix('.pkl')
+
+        if cache_path.exists() and cache_path.stat().st_mtime >= self.config_path.stat().st_mtime:
+            try:
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception:
+                pass  # stale/corrupt cache: fall through to a fresh parse
+
         with open(self.config_path, 'r') as f:
-            self._config = yaml.safe_load(f)
-    
+            config = yaml.load(f, Loader=_YamlLoader)
+
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump(config, f)
+        except OSError:
+            pass  # read-only deployments still work, just without the cache
+
+        return config
+
+    def _flatten(self, node: Dict[str, Any], prefix: str):
+        """Record every dotted path; subtrees stay addressable too"""
+        for k, v in node.items():
+            key = f"{prefix}.{k}" if prefix else k
+            self._flat[key] = v
+            if isinstance(v, dict):
+                self._flatten(v, key)
+
+    def reload(self):
+        """Re-read the YAML file and environment overrides"""
+        self._load()
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get configuration value with dot notation support
-        
+
         Args:
             key: Configuration key (e.g., 'detector.model_path')
             default: Default value if key not found
-            
+
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        value = self._config
-        
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-                if value is None:
-                    return default
-            else:
-                return default
-        
-        # Override with environment variable if exists
-        env_key = key.upper().replace('.', '_')
-        env_value = os.getenv(env_key)
-        if env_value is not None:
-            return env_value
-        
-        return value
+        value = self._flat.get(key)
+        return default if value is None else value
     
     def get_section(self, section: str) -> Dict[str, Any]:
         """
@@ -1,14 +1,63 @@
 """
 YOLOv8 aircraft detector wrapper
 """
-import torch
+from __future__ import annotations
+
+import os
+
+import cv2
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import TYPE_CHECKING, List, Tuple, Optional
 from pathlib import Path
 import logging
 
+# torch is imported lazily in _load_model so the ONNX backend (and module
+# importers that never run inference) skip its load cost
+if TYPE_CHECKING:
+    import torch
+
 logger = logging.getLogger(__name__)
 
+# Full COCO class table, indexed by class id (O(1) tuple lookup)
+_COCO_NAMES = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train",
+    "truck", "boat", "traffic light", "fire hydrant", "stop sign",
+    "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow",
+    "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag",
+    "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball", "kite",
+    "baseball bat", "baseball glove", "skateboard", "surfboard",
+    "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon",
+    "bowl", "banana", "apple", "sandwich", "orange", "broccoli", "carrot",
+    "hot dog", "pizza", "donut", "cake", "chair", "couch", "potted plant",
+    "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote",
+    "keyboard", "cell phone", "microwave", "oven", "toaster", "sink",
+    "refrigerator", "book", "clock", "vase", "scissors", "teddy bear",
+    "hair drier", "toothbrush"
+)
+
+try:
+    from onnxruntime.quantization import CalibrationDataReader as _CalibrationDataReader
+except ImportError:
+    _CalibrationDataReader = object
+
+
+class _YoloCalibrationReader(_CalibrationDataReader):
+    """Feeds ~100 representative video frames to static INT8 calibration"""
+
+    def __init__(self, video_path: str, preprocess, max_frames: int = 100):
+        self.capture = cv2.VideoCapture(video_path)
+        self.preprocess = preprocess
+        self.remaining = max_frames
+
+    def get_next(self):
+        if self.remaining <= 0:
+            return None
+        ret, frame = self.capture.read()
+        if not ret:
+            return None
+        self.remaining -= 1
+        return {"images": self.preprocess(frame)}
+
 
 class Detector:
     """YOLOv8 object detector for aircraft"""
@@ -19,32 +68,55 @@ class Detector:
         conf_threshold: float = 0.35,
         iou_threshold: float = 0.45,
         device: str = "cpu",
-        classes: Optional[List[int]] = None
+        classes: Optional[List[int]] = None,
+        backend: str = "torch",
+        calibration_video: Optional[str] = None
     ):
         """
         Initialize YOLOv8 detector
-        
+
         Args:
             model_path: Path to YOLO model weights
             conf_threshold: Confidence threshold for detections
             iou_threshold: IOU threshold for NMS
             device: Device to run on ('cpu' or 'cuda')
             classes: List of COCO class IDs to detect (None for all)
+            backend: 'torch' (Ultralytics eager), 'onnxruntime' (INT8 CPU)
+                or 'openvino' (Intel CPU with layer fusion / VNNI INT8)
+            calibration_video: Video of representative frames for static
+                INT8 calibration (dynamic quantization is used without it)
         """
         self.model_path = model_path
         self.conf_threshold = conf_threshold
         self.iou_threshold = iou_threshold
         self.device = device
         self.classes = classes  # [4] for airplane in COCO
-        
+        self.backend = backend
+        self.calibration_video = calibration_video
+
         self.model = None
-        self._load_model()
+        self.session = None
+        self._input_name = None
+
+        if self.backend == "onnxruntime":
+            self._load_onnx_model()
+        elif self.backend == "openvino":
+            self._load_openvino_model()
+        if self.session is None and self.model is None:
+            self._load_model()
     
     def _load_model(self):
         """Load YOLO model"""
         try:
+            import torch
             from ultralytics import YOLO
-            
+
+            # A prebuilt TensorRT engine can be pointed at directly
+            if str(self.model_path).endswith('.engine'):
+                self.model = YOLO(self.model_path)
+                logger.info(f"Loaded TensorRT engine from {self.model_path}")
+                return
+
             # Auto-download if not exists
             if not Path(self.model_path).exists():
                 logger.info(f"Model not found at {self.model_path}, downloading...")
@@ -56,8 +128,7 @@ class Detector:
             
             # Move to device
             if self.device == "cuda" and torch.cuda.is_available():
-                self.model.to('cuda')
-                logger.info("Using CUDA for detection")
+                self._load_tensorrt(YOLO)
             else:
                 logger.info("Using CPU for detection")
             
@@ -70,6 +141,170 @@ class Detector:
             logger.error(f"Failed to load model: {e}")
             raise
     
+    def _load_tensorrt(self, YOLO):
+        """Swap the CUDA model for a TensorRT FP16 engine (built on first run)
+
+        TRT fuses conv+BN+activation and runs on Tensor Cores; the eager
+        PyTorch model stays as the fallback when the TRT stack is absent.
+        """
+        engine_path = Path(self.model_path).with_suffix('.engine')
+        try:
+            if not engine_path.exists():
+                logger.info("Building TensorRT engine (one-off, takes a few minutes)...")
+                self.model.export(format="engine", half=True, workspace=4)
+
+            self.model = YOLO(str(engine_path))
+            logger.info("Using TensorRT FP16 engine for detection")
+
+        except Exception as e:
+            logger.warning(f"TensorRT unavailable ({e}); using PyTorch CUDA model")
+            self.model.to('cuda')
+            logger.info("Using CUDA for detection")
+
+    def _load_openvino_model(self):
+        """Export once to OpenVINO IR and serve via ultralytics' OV runtime
+
+        Layer fusion comes free with the IR compile; INT8 (VNNI) is
+        attempted first but needs a calibration dataset, so it falls back
+        to FP32 IR and, failing that, to the PyTorch backend.
+        """
+        try:
+            from ultralytics import YOLO
+
+            ov_dir = Path(self.model_path).with_name(
+                Path(self.model_path).stem + "_openvino_model"
+            )
+
+            if not ov_dir.exists():
+                logger.info("Exporting YOLO model to OpenVINO IR (one-off)...")
+                export_model = YOLO(self.model_path)
+                try:
+                    export_model.export(format="openvino", int8=True)
+                    logger.info("Exported INT8 OpenVINO model")
+                except Exception as e:
+                    logger.warning(f"INT8 OpenVINO export failed ({e}); exporting FP32 IR")
+                    export_model.export(format="openvino")
+
+            self.model = YOLO(str(ov_dir))
+            logger.info(f"Loaded OpenVINO model from {ov_dir}")
+
+        except Exception as e:
+            logger.error(f"Failed to load OpenVINO model: {e}. Falling back to PyTorch backend")
+            self.model = None
+
+    def _load_onnx_model(self):
+        """Load (exporting/quantizing on first use) the INT8 ONNX session"""
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.error(
+                "onnxruntime not installed. Install with: pip install onnxruntime. "
+                "Falling back to PyTorch backend"
+            )
+            return
+
+        try:
+            int8_path = Path(self.model_path).with_suffix('.int8.onnx')
+            if not int8_path.exists():
+                self._export_quantized_onnx(int8_path)
+
+            sess_options = ort.SessionOptions()
+            sess_options.intra_op_num_threads = os.cpu_count()
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+            self.session = ort.InferenceSession(
+                str(int8_path),
+                sess_options,
+                providers=["CPUExecutionProvider"]
+            )
+            self._input_name = self.session.get_inputs()[0].name
+            self._input_size = self.session.get_inputs()[0].shape[2]  # square imgsz
+
+            logger.info(f"Loaded INT8 ONNX detector from {int8_path}")
+
+        except Exception as e:
+            logger.error(f"Failed to load ONNX model: {e}. Falling back to PyTorch backend")
+            self.session = None
+
+    def _export_quantized_onnx(self, int8_path: Path):
+        """Export the YOLO weights to ONNX and quantize to INT8 (one-off)"""
+        from ultralytics import YOLO
+        from onnxruntime.quantization import quantize_dynamic, quantize_static, QuantType
+
+        logger.info("Exporting YOLO model to ONNX (one-off)...")
+        onnx_path = YOLO(self.model_path).export(format="onnx", imgsz=640, simplify=True)
+
+        if self.calibration_video and Path(self.calibration_video).exists():
+            logger.info(f"Static INT8 quantization with {self.calibration_video}")
+            quantize_static(
+                str(onnx_path),
+                str(int8_path),
+                _YoloCalibrationReader(self.calibration_video, self._preprocess_onnx)
+            )
+        else:
+            logger.info("No calibration video; dynamic INT8 quantization")
+            quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    @staticmethod
+    def _preprocess_onnx(frame: np.ndarray, size: int = 640) -> np.ndarray:
+        """BGR frame -> (1, 3, size, size) float32 RGB blob in [0, 1]
+
+        blobFromImage fuses resize, BGR->RGB swap, scaling and the NCHW
+        layout change into one C pass over the pixels.
+        """
+        return cv2.dnn.blobFromImage(
+            frame, scalefactor=1.0 / 255.0, size=(size, size),
+            swapRB=True, crop=False
+        )
+
+    def _predict_onnx(
+        self,
+        frame: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Run the ONNX session and decode YOLOv8 raw output + NMS"""
+        h, w = frame.shape[:2]
+        size = self._input_size
+        blob = self._preprocess_onnx(frame, size)
+
+        # (1, 4 + num_classes, num_anchors) -> (num_anchors, 4 + num_classes)
+        output = self.session.run(None, {self._input_name: blob})[0][0].T
+
+        boxes_cxcywh = output[:, :4]
+        class_scores = output[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        confidences = class_scores[np.arange(len(class_ids)), class_ids]
+
+        keep = confidences >= self.conf_threshold
+        if self.classes is not None:
+            keep &= np.isin(class_ids, self.classes)
+        if not keep.any():
+            return np.array([]), np.array([]), np.array([])
+
+        boxes_cxcywh = boxes_cxcywh[keep]
+        confidences = confidences[keep]
+        class_ids = class_ids[keep]
+
+        # cxcywh (model scale) -> xywh for NMS
+        xy = boxes_cxcywh[:, :2] - boxes_cxcywh[:, 2:] / 2
+        boxes_xywh = np.hstack([xy, boxes_cxcywh[:, 2:]])
+
+        kept = cv2.dnn.NMSBoxes(
+            boxes_xywh.tolist(), confidences.tolist(),
+            self.conf_threshold, self.iou_threshold
+        )
+        if len(kept) == 0:
+            return np.array([]), np.array([]), np.array([])
+        kept = np.asarray(kept).reshape(-1)
+
+        # xywh -> xyxy, scaled back to the original frame
+        scale = np.array([w / size, h / size, w / size, h / size])
+        boxes_xyxy = np.hstack([
+            boxes_xywh[kept, :2],
+            boxes_xywh[kept, :2] + boxes_xywh[kept, 2:]
+        ]) * scale
+
+        return boxes_xyxy, confidences[kept], class_ids[kept].astype(int)
+
     def predict(
         self,
         frame: np.ndarray
@@ -86,9 +321,12 @@ class Detector:
             - confidences: np.array of shape (N,)
             - class_ids: np.array of shape (N,)
         """
+        if self.session is not None:
+            return self._predict_onnx(frame)
+
         if self.model is None:
             raise RuntimeError("Model not loaded")
-        
+
         # Run inference
         results = self.model.predict(
             frame,
@@ -111,6 +349,38 @@ class Detector:
         
         return bboxes, confidences, class_ids
     
+    def predict_tensor(
+        self,
+        frame: np.ndarray
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Run detection, returning device-resident tensors (no CPU sync).
+
+        Lets a downstream GPU consumer (e.g. roi_align crop extraction)
+        use the boxes without the .cpu().numpy() round-trip predict() does.
+        Only supported on the PyTorch backend.
+
+        Args:
+            frame: Input image (BGR format)
+
+        Returns:
+            Tuple of (bboxes, confidences, class_ids) torch tensors on the
+            model's device; bboxes are xyxy
+        """
+        if self.model is None:
+            raise RuntimeError("predict_tensor requires the PyTorch backend")
+
+        results = self.model.predict(
+            frame,
+            conf=self.conf_threshold,
+            iou=self.iou_threshold,
+            classes=self.classes,
+            verbose=False
+        )[0]
+
+        boxes = results.boxes
+        return boxes.xyxy, boxes.conf, boxes.cls.int()
+
     def detect_batch(
         self,
         frames: List[np.ndarray]
@@ -157,12 +427,9 @@ class Detector:
         Returns:
             Class name string
         """
-        # COCO class names (partial - only relevant ones)
-        coco_names = {
-            4: "airplane",
-            # Add more if needed
-        }
-        return coco_names.get(class_id, f"class_{class_id}")
+        if 0 <= class_id < len(_COCO_NAMES):
+            return _COCO_NAMES[class_id]
+        return f"class_{class_id}"
 
 
 if __name__ == "__main__":
@@ -4,6 +4,9 @@ Homography calibration tool for image-to-world coordinate mapping
 import cv2
 import numpy as np
 import json
+import threading
+from functools import lru_cache
+from math import hypot
 from pathlib import Path
 from typing import List, Tuple, Optional
 import logging
@@ -20,12 +23,13 @@ class HomographyCalibrator:
         self.world_points = []
         self.image = None
         self.window_name = "Homography Calibration - Click 4 Points"
-    
+        self._points_done = threading.Event()
+
     def mouse_callback(self, event, x, y, flags, param):
         """Mouse click callback for point selection"""
         if event == cv2.EVENT_LBUTTONDOWN and len(self.image_points) < 4:
             self.image_points.append([x, y])
-            
+
             # Draw point
             cv2.circle(self.image, (x, y), 5, (0, 0, 255), -1)
             cv2.putText(
@@ -38,16 +42,25 @@ class HomographyCalibrator:
                 2
             )
             cv2.imshow(self.window_name, self.image)
-            
+
             logger.info(f"Selected point {len(self.image_points)}: ({x}, {y})")
-    
-    def calibrate_interactive(self, image_path: str) -> Optional[np.ndarray]:
+
+            if len(self.image_points) == 4:
+                self._points_done.set()
+
+    def calibrate_interactive(
+        self,
+        image_path: str,
+        world_points: Optional[List[List[float]]] = None
+    ) -> Optional[np.ndarray]:
         """
         Interactive calibration - user clicks 4 points
-        
+
         Args:
             image_path: Path to calibration image
-            
+            world_points: Optional 4 pre-supplied world coordinates (meters);
+                skips the interactive prompts for automated calibration
+
         Returns:
             3x3 homography matrix or None if cancelled
         """
@@ -71,27 +84,35 @@ class HomographyCalibrator:
         print("\nPress 'q' to quit without saving")
         print("=" * 50)
         
-        while len(self.image_points) < 4:
-            key = cv2.waitKey(1) & 0xFF
+        # The callback flags completion; waitKey(100) keeps the HighGUI
+        # event loop pumping without the old 1ms busy-spin
+        while not self._points_done.is_set():
+            key = cv2.waitKey(100) & 0xFF
             if key == ord('q'):
                 cv2.destroyAllWindows()
                 return None
-        
+
         # Get world coordinates from user
         print("\nImage points selected:")
         for i, pt in enumerate(self.image_points, 1):
             print(f"  P{i}: {pt}")
-        
-        print("\nEnter corresponding world coordinates (in meters):")
-        for i in range(4):
-            while True:
-                try:
-                    x = float(input(f"  P{i+1} - X coordinate (m): "))
-                    y = float(input(f"  P{i+1} - Y coordinate (m): "))
-                    self.world_points.append([x, y])
-                    break
-                except ValueError:
-                    print("  Invalid input. Please enter numbers.")
+
+        if world_points is not None:
+            self.world_points = [list(pt) for pt in world_points]
+            print("\nUsing supplied world coordinates (in meters):")
+            for i, pt in enumerate(self.world_points, 1):
+                print(f"  P{i}: {pt}")
+        else:
+            print("\nEnter corresponding world coordinates (in meters):")
+            for i in range(4):
+                while True:
+                    try:
+                        x = float(input(f"  P{i+1} - X coordinate (m): "))
+                        y = float(input(f"  P{i+1} - Y coordinate (m): "))
+                        self.world_points.append([x, y])
+                        break
+                    except ValueError:
+                        print("  Invalid input. Please enter numbers.")
         
         # Compute homography
         H = self.compute_homography()
@@ -147,69 +168,203 @@ class HomographyCalibrator:
     def load_homography(file_path: str) -> Optional[np.ndarray]:
         """
         Load homography matrix from JSON file
-        
+
+        The matrix comes back float32-contiguous (OpenCV's SIMD transform
+        paths want that layout) and repeat loads of an unchanged file are
+        served from an mtime-keyed cache.
+
         Args:
             file_path: Input file path
-            
+
         Returns:
             3x3 homography matrix or None if not found
         """
         if not Path(file_path).exists():
             logger.warning(f"Homography file not found: {file_path}")
             return None
-        
+
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            H = np.array(data["homography_matrix"], dtype=np.float64)
-            logger.info(f"Loaded homography from {file_path}")
-            return H
-            
+            return _load_homography_cached(
+                str(file_path), Path(file_path).stat().st_mtime
+            )
         except Exception as e:
             logger.error(f"Failed to load homography: {e}")
             return None
 
 
+@lru_cache(maxsize=8)
+def _load_homography_cached(file_path: str, mtime: float) -> np.ndarray:
+    """Parse the homography JSON; keyed on (path, mtime) by the caller"""
+    with open(file_path, 'r') as f:
+        data = json.load(f)
+
+    H = np.ascontiguousarray(data["homography_matrix"], dtype=np.float32)
+    logger.info(f"Loaded homography from {file_path}")
+    return H
+
+
+def image_to_world_batch(H: np.ndarray, uv: np.ndarray) -> np.ndarray:
+    """
+    Transform many image coordinates to world coordinates at once
+
+    One matmul over the whole batch replaces a Python call plus a 3x3
+    dispatch per point.
+
+    Args:
+        H: 3x3 homography matrix
+        uv: (N, 2) array of image coordinates (pixels)
+
+    Returns:
+        (N, 2) array of world coordinates in meters
+    """
+    uv = np.asarray(uv, dtype=np.float64)
+
+    # Convert to homogeneous coordinates
+    uv_h = np.hstack([uv, np.ones((len(uv), 1), dtype=uv.dtype)])
+
+    # Apply homography, convert back from homogeneous
+    world_h = uv_h @ H.T
+    return world_h[:, :2] / world_h[:, 2:3]
+
+
 def image_to_world(H: np.ndarray, u: float, v: float) -> Tuple[float, float]:
     """
     Transform image coordinates to world coordinates
-    
+
     Args:
         H: 3x3 homography matrix
         u: Image x coordinate (pixels)
         v: Image y coordinate (pixels)
-        
+
     Returns:
         (x, y) world coordinates in meters
     """
-    # Convert to homogeneous coordinates
-    img_pt = np.array([u, v, 1.0])
-    
-    # Apply homography
-    world_pt_h = H @ img_pt
-    
-    # Convert back from homogeneous
-    x = world_pt_h[0] / world_pt_h[2]
-    y = world_pt_h[1] / world_pt_h[2]
-    
-    return x, y
+    # Inlined 3x3 apply: pure scalar math beats boxing a 3-element array
+    # through NumPy for the one-point case called per detection
+    a, b, c, d, e, f, g, h, i = H.ravel()
+    z = g * u + h * v + i
+    return float((a * u + b * v + c) / z), float((d * u + e * v + f) / z)
 
 
 def world_distance(pt1: Tuple[float, float], pt2: Tuple[float, float]) -> float:
     """
     Calculate Euclidean distance between two world points
-    
+
     Args:
         pt1: First point (x, y) in meters
         pt2: Second point (x, y) in meters
-        
+
     Returns:
         Distance in meters
     """
-    dx = pt2[0] - pt1[0]
-    dy = pt2[1] - pt1[1]
-    return np.sqrt(dx**2 + dy**2)
+    # Single libm call: no NumPy scalar dispatch, no squaring overflow
+    return hypot(pt2[0] - pt1[0], pt2[1] - pt1[1])
+
+
+def world_distance_batch(pts1: np.ndarray, pts2: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distances between two (N, 2) arrays of world points
+
+    Args:
+        pts1: First points, shape (N, 2), in meters
+        pts2: Second points, shape (N, 2), in meters
+
+    Returns:
+        (N,) array of distances in meters
+    """
+    pts1 = np.asarray(pts1, dtype=np.float64)
+    pts2 = np.asarray(pts2, dtype=np.float64)
+    return np.hypot(pts2[:, 0] - pts1[:, 0], pts2[:, 1] - pts1[:, 1])
+
+
+class HomographyTracker:
+    """
+    Keeps the image->world homography current for a moving camera (PTZ/drone)
+
+    Full keyframe refresh happens every key_interval frames; in between,
+    the current frame is matched to the last keyframe with ORB features and
+    the world homography is updated by composing the cheap image-to-image
+    transform with the keyframe's world homography - no per-frame
+    re-calibration against the ground plane.
+    """
+
+    def __init__(
+        self,
+        initial_H: np.ndarray,
+        key_interval: int = 30,
+        max_features: int = 500
+    ):
+        """
+        Args:
+            initial_H: Image->world homography for the first frame
+            key_interval: Frames between full keyframe refreshes
+            max_features: ORB feature budget per frame
+        """
+        self.H_world = np.asarray(initial_H, dtype=np.float64)
+        self.key_interval = key_interval
+
+        self.orb = cv2.ORB_create(max_features)
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+
+        self._key_keypoints = None
+        self._key_descriptors = None
+        self._key_H_world = None
+
+    def update_for_frame(self, frame: np.ndarray, frame_number: int) -> np.ndarray:
+        """
+        Update and return the image->world homography for this frame
+
+        Args:
+            frame: Current BGR frame
+            frame_number: Frame index (drives keyframe cadence)
+
+        Returns:
+            3x3 image->world homography for the current frame
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        if self._key_descriptors is None or frame_number % self.key_interval == 0:
+            self._set_keyframe(gray)
+            return self.H_world
+
+        keypoints, descriptors = self.orb.detectAndCompute(gray, None)
+        if descriptors is None:
+            return self.H_world
+
+        matches = self.matcher.match(self._key_descriptors, descriptors)
+        if len(matches) < 8:
+            return self.H_world
+
+        key_pts = np.float32(
+            [self._key_keypoints[m.queryIdx].pt for m in matches]
+        ).reshape(-1, 1, 2)
+        cur_pts = np.float32(
+            [keypoints[m.trainIdx].pt for m in matches]
+        ).reshape(-1, 1, 2)
+
+        H_cur_to_key, _ = cv2.findHomography(cur_pts, key_pts, cv2.RANSAC, 3.0)
+        if H_cur_to_key is None:
+            return self.H_world
+
+        # current frame -> keyframe -> world
+        self.H_world = self._key_H_world @ H_cur_to_key
+        return self.H_world
+
+    def _set_keyframe(self, gray: np.ndarray):
+        """Record the current frame as the new keyframe"""
+        self._key_keypoints, self._key_descriptors = self.orb.detectAndCompute(gray, None)
+        self._key_H_world = self.H_world.copy()
+
+
+def _parse_world_points(arg: str) -> List[List[float]]:
+    """Parse 'x1,y1;x2,y2;x3,y3;x4,y4' into four [x, y] pairs"""
+    points = []
+    for pair in arg.split(';'):
+        x, y = pair.split(',')
+        points.append([float(x), float(y)])
+    if len(points) != 4:
+        raise ValueError(f"Expected 4 world points, got {len(points)}")
+    return points
 
 
 def main():
@@ -217,10 +372,15 @@ def main():
     parser = argparse.ArgumentParser(description="Homography Calibration Tool")
     parser.add_argument("--image", required=True, help="Path to calibration image")
     parser.add_argument("--output", default="homography.json", help="Output file path")
+    parser.add_argument(
+        "--world-points", type=_parse_world_points, default=None,
+        help="World coordinates as 'x1,y1;x2,y2;x3,y3;x4,y4' (meters), "
+             "skipping the interactive prompts"
+    )
     args = parser.parse_args()
-    
+
     calibrator = HomographyCalibrator()
-    H = calibrator.calibrate_interactive(args.image)
+    H = calibrator.calibrate_interactive(args.image, world_points=args.world_points)
     
     if H is not None:
         HomographyCalibrator.save_homography(H, args.output)
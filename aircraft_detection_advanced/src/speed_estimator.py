@@ -1,17 +1,44 @@
 """
 Speed estimation from tracking and homography
 """
+import cv2
 import numpy as np
+from numba import njit
 from typing import Tuple, Optional, List, Dict
 import logging
 from src.homography_calib import image_to_world, world_distance
 
 logger = logging.getLogger(__name__)
 
+# Knots per meter-per-second
+_KNOTS_PER_MPS = 1.94384
+
+
+@njit(cache=True)
+def _fallback_xform(cx, cy, bbox_width_px, fallback_width, focal_length):
+    """Pinhole ground-plane projection (jitted core of the fallback path)"""
+    distance = (fallback_width * focal_length) / bbox_width_px
+    scale = distance / focal_length
+    return cx * scale, cy * scale
+
+
+@njit(cache=True)
+def _speed_from_last2(t1, x1, y1, t2, x2, y2):
+    """Instantaneous speed from the last two (t, x, y) samples"""
+    dt = t2 - t1
+    if dt <= 0:
+        return 0.0
+    dx = x2 - x1
+    dy = y2 - y1
+    return (dx * dx + dy * dy) ** 0.5 / dt
+
 
 class SpeedEstimator:
     """Aircraft speed estimation using homography or fallback methods"""
-    
+
+    # Ring-buffer depth per track (for smoothing)
+    MAX_HISTORY = 10
+
     def __init__(
         self,
         homography_matrix: Optional[np.ndarray] = None,
@@ -39,32 +66,51 @@ class SpeedEstimator:
         self.fallback_altitude = fallback_altitude_m
         self.focal_length = camera_focal_length_px
         
-        # Track history: {id: [(timestamp, world_pos), ...]}
-        self.track_history = {}
-        
+        # Track history as struct-of-arrays ring buffers: one preallocated
+        # (slots, max_history, 3) block of (t, x, y) rows plus per-slot
+        # head/length counters - steady-state speed updates allocate nothing
+        self._hist = np.empty((64, self.MAX_HISTORY, 3), dtype=np.float64)
+        self._head = np.zeros(64, dtype=np.int32)
+        self._length = np.zeros(64, dtype=np.int32)
+        self._id2slot: Dict[int, int] = {}
+        self._free_slots = list(range(63, -1, -1))
+
         self.use_homography = homography_matrix is not None
-        
+
+        # Near-nadir cameras give an effectively affine H: specialize to a
+        # 2x3 multiply and skip the projective divide entirely
+        self._affine = self._detect_affine(self.H) if self.use_homography else None
+        if self._affine is not None:
+            logger.info("Homography is affine; using 2x3 fast path")
+
         if self.use_homography:
             logger.info("Speed estimator using homography-based method")
         else:
             logger.info("Speed estimator using fallback pinhole model")
+
+        # Pay the one-off numba compile cost here, not on the first frame
+        _fallback_xform(0.0, 0.0, 1.0, self.fallback_width, self.focal_length)
+        _speed_from_last2(0.0, 0.0, 0.0, 1.0, 1.0, 1.0)
     
     def estimate_speed(
         self,
         track_id: int,
         centroid: Tuple[float, float],
         bbox: Tuple[float, float, float, float],
-        frame_number: int
+        frame_number: int,
+        world_pos: Optional[Tuple[float, float]] = None
     ) -> Optional[Tuple[float, float, Tuple[float, float]]]:
         """
         Estimate speed for a tracked object
-        
+
         Args:
             track_id: Unique track ID
             centroid: Image centroid (cx, cy) in pixels
             bbox: Bounding box [x1, y1, x2, y2] for fallback method
             frame_number: Current frame number
-            
+            world_pos: Pre-transformed world position (e.g. from
+                batch_transform); skips the per-call transform
+
         Returns:
             Tuple of (speed_mps, speed_kt, world_pos) or None if insufficient data
             - speed_mps: Speed in meters per second
@@ -72,38 +118,54 @@ class SpeedEstimator:
             - world_pos: Current world position (x, y) in meters
         """
         timestamp = frame_number * self.frame_time
-        
-        # Transform to world coordinates
-        if self.use_homography:
-            world_pos = self._transform_with_homography(centroid)
-        else:
-            world_pos = self._transform_with_fallback(centroid, bbox)
+
+        # Transform to world coordinates (unless the caller already did)
+        if world_pos is None:
+            if self.use_homography:
+                world_pos = self._transform_with_homography(centroid)
+            else:
+                world_pos = self._transform_with_fallback(centroid, bbox)
         
         if world_pos is None:
             return None
-        
-        # Initialize track history
-        if track_id not in self.track_history:
-            self.track_history[track_id] = []
-        
-        # Add current position
-        self.track_history[track_id].append((timestamp, world_pos))
-        
-        # Keep last N positions (for smoothing)
-        max_history = 10
-        if len(self.track_history[track_id]) > max_history:
-            self.track_history[track_id] = self.track_history[track_id][-max_history:]
-        
+
+        # Write the sample into the track's ring buffer
+        slot = self._id2slot.get(track_id)
+        if slot is None:
+            slot = self._acquire_slot(track_id)
+
+        head = self._head[slot]
+        self._hist[slot, head, 0] = timestamp
+        self._hist[slot, head, 1] = world_pos[0]
+        self._hist[slot, head, 2] = world_pos[1]
+        self._head[slot] = (head + 1) % self.MAX_HISTORY
+        if self._length[slot] < self.MAX_HISTORY:
+            self._length[slot] += 1
+
         # Need at least 2 positions to compute speed
-        if len(self.track_history[track_id]) < 2:
+        if self._length[slot] < 2:
             return 0.0, 0.0, world_pos
         
         # Compute speed from recent positions
         speed_mps = self._compute_speed_from_history(track_id)
-        speed_kt = self._mps_to_knots(speed_mps)
+        speed_kt = speed_mps * _KNOTS_PER_MPS
         
         return speed_mps, speed_kt, world_pos
     
+    @staticmethod
+    def _detect_affine(H) -> Optional[np.ndarray]:
+        """Return the normalized 2x3 affine when H's projective row is ~0"""
+        H = np.asarray(H, dtype=np.float64)
+        if abs(H[2, 0]) + abs(H[2, 1]) < 1e-6:
+            return H[:2, :] / H[2, 2]
+        return None
+
+    def set_homography(self, homography_matrix: np.ndarray):
+        """Swap in an updated homography (e.g. from HomographyTracker)"""
+        self.H = homography_matrix
+        self.use_homography = homography_matrix is not None
+        self._affine = self._detect_affine(self.H) if self.use_homography else None
+
     def _transform_with_homography(
         self,
         centroid: Tuple[float, float]
@@ -111,13 +173,37 @@ class SpeedEstimator:
         """Transform image point to world coordinates using homography"""
         if self.H is None:
             return None
-        
+
         try:
-            world_pos = image_to_world(self.H, centroid[0], centroid[1])
-            return world_pos
+            if self._affine is not None:
+                A = self._affine
+                cx, cy = centroid
+                return (
+                    A[0, 0] * cx + A[0, 1] * cy + A[0, 2],
+                    A[1, 0] * cx + A[1, 1] * cy + A[1, 2]
+                )
+            return image_to_world(self.H, centroid[0], centroid[1])
         except Exception as e:
             logger.error(f"Homography transform failed: {e}")
             return None
+
+    def batch_transform(self, centroids: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Transform all (N, 2) image centroids to world coordinates at once
+
+        One vectorized multiply (affine) or one cv2.perspectiveTransform
+        call replaces N per-track Python transforms.
+        """
+        if self.H is None:
+            return None
+
+        centroids = np.asarray(centroids, dtype=np.float64)
+        if self._affine is not None:
+            return centroids @ self._affine[:, :2].T + self._affine[:, 2]
+
+        return cv2.perspectiveTransform(
+            centroids.reshape(-1, 1, 2), np.asarray(self.H, dtype=np.float64)
+        ).reshape(-1, 2)
     
     def _transform_with_fallback(
         self,
@@ -137,67 +223,76 @@ class SpeedEstimator:
         # Get object width in pixels
         x1, y1, x2, y2 = bbox
         bbox_width_px = x2 - x1
-        
+
         if bbox_width_px <= 0:
             return None
-        
-        # Estimate distance using pinhole model
-        # distance = (real_width * focal_length) / pixel_width
-        distance = (self.fallback_width * self.focal_length) / bbox_width_px
-        
-        # Assume camera center is at (0, 0) in image coordinates
-        # Convert centroid to camera coordinates (simple approximation)
-        cx, cy = centroid
-        
-        # Simple planar approximation: world x,y proportional to image displacement
-        # This is very rough but works for demo without camera calibration
-        scale = distance / self.focal_length
-        world_x = cx * scale
-        world_y = cy * scale
-        
-        return (world_x, world_y)
+
+        # Pinhole model: distance = (real_width * focal_length) / pixel_width,
+        # then a rough planar approximation of world x,y from displacement -
+        # the numeric core is jitted
+        return _fallback_xform(
+            float(centroid[0]), float(centroid[1]), float(bbox_width_px),
+            self.fallback_width, self.focal_length
+        )
     
+    def _acquire_slot(self, track_id: int) -> int:
+        """Assign a ring-buffer slot to a new track (growing if exhausted)"""
+        if not self._free_slots:
+            old_slots = self._hist.shape[0]
+            self._hist = np.concatenate([self._hist, np.empty_like(self._hist)])
+            self._head = np.concatenate([self._head, np.zeros(old_slots, dtype=np.int32)])
+            self._length = np.concatenate([self._length, np.zeros(old_slots, dtype=np.int32)])
+            self._free_slots.extend(range(2 * old_slots - 1, old_slots - 1, -1))
+
+        slot = self._free_slots.pop()
+        self._id2slot[track_id] = slot
+        self._head[slot] = 0
+        self._length[slot] = 0
+        return slot
+
     def _compute_speed_from_history(self, track_id: int) -> float:
         """
-        Compute speed from track history using linear regression or last two points
-        
+        Compute speed from track history using the last two ring-buffer rows
+
         Args:
             track_id: Track ID
-            
+
         Returns:
             Speed in m/s
         """
-        history = self.track_history[track_id]
-        
-        if len(history) < 2:
-            return 0.0
-        
-        # Use last two positions for instantaneous speed
-        (t1, pos1) = history[-2]
-        (t2, pos2) = history[-1]
-        
-        dt = t2 - t1
-        if dt <= 0:
+        slot = self._id2slot.get(track_id)
+        if slot is None or self._length[slot] < 2:
             return 0.0
-        
-        distance = world_distance(pos1, pos2)
-        speed = distance / dt
-        
-        return speed
+
+        head = self._head[slot]
+        last = (head - 1) % self.MAX_HISTORY
+        prev = (head - 2) % self.MAX_HISTORY
+        rows = self._hist[slot]
+
+        return _speed_from_last2(
+            rows[prev, 0], rows[prev, 1], rows[prev, 2],
+            rows[last, 0], rows[last, 1], rows[last, 2]
+        )
     
     @staticmethod
     def _mps_to_knots(speed_mps: float) -> float:
         """Convert meters per second to knots"""
-        return speed_mps * 1.94384
+        return speed_mps * _KNOTS_PER_MPS
     
     def reset_track(self, track_id: int):
         """Clear history for a specific track"""
-        if track_id in self.track_history:
-            del self.track_history[track_id]
-    
+        slot = self._id2slot.pop(track_id, None)
+        if slot is not None:
+            self._length[slot] = 0
+            self._head[slot] = 0
+            self._free_slots.append(slot)
+
     def reset_all(self):
         """Clear all track histories"""
-        self.track_history.clear()
+        self._id2slot.clear()
+        self._length[:] = 0
+        self._head[:] = 0
+        self._free_slots = list(range(self._hist.shape[0] - 1, -1, -1))
 
 
 if __name__ == "__main__":
@@ -11,14 +11,14 @@ from src.homography_calib import HomographyCalibrator
 class TestSpeedEstimator:
     """Test speed estimation"""
     
-    @pytest.fixture
+    @pytest.fixture(scope='module')
     def identity_homography(self):
         """Identity homography (pixel == meter)"""
         image_points = np.array([[0, 0], [100, 0], [100, 100], [0, 100]], dtype=np.float32)
         world_points = np.array([[0, 0], [100, 0], [100, 100], [0, 100]], dtype=np.float32)
         return HomographyCalibrator.compute_homography(image_points, world_points)
     
-    @pytest.fixture
+    @pytest.fixture(scope='module')
     def scale_homography(self):
         """10x scale homography (100 pixels == 1000 meters)"""
         image_points = np.array([[0, 0], [100, 0], [100, 100], [0, 100]], dtype=np.float32)
@@ -17,9 +17,10 @@ class TestThreatAnalyzer:
         """Basic threat analyzer without zones"""
         return ThreatAnalyzer()
     
-    @pytest.fixture
-    def test_zones_file(self, tmp_path):
+    @pytest.fixture(scope='session')
+    def test_zones_file(self, tmp_path_factory):
         """Create test GeoJSON zones file"""
+        tmp_path = tmp_path_factory.mktemp("zones")
         zones = {
             "type": "FeatureCollection",
             "features": [
@@ -40,9 +41,10 @@ class TestThreatAnalyzer:
         
         return str(zones_file)
     
-    @pytest.fixture
-    def test_allowlist_file(self, tmp_path):
+    @pytest.fixture(scope='session')
+    def test_allowlist_file(self, tmp_path_factory):
         """Create test allowlist file"""
+        tmp_path = tmp_path_factory.mktemp("allowlist")
         allowlist = tmp_path / "allowlist.csv"
         with open(allowlist, 'w') as f:
             f.write("transponder_id,description\n")
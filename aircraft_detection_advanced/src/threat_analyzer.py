@@ -2,14 +2,105 @@
 Rule-based threat analyzer with explainable scoring
 """
 import numpy as np
+import shapely
 from typing import Dict, List, Optional, Tuple
 from shapely.geometry import Point, shape
+from shapely.strtree import STRtree
+import bisect
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
 import logging
 
+try:
+    from src.threat_kernels import (
+        score_kernel, points_in_polygons,
+        ZONE_BIT, TRANSPONDER_BIT, SPEED_BIT, MILITARY_BIT, ALTITUDE_BIT
+    )
+except ImportError:  # running as a plain script from src/
+    from threat_kernels import (
+        score_kernel, points_in_polygons,
+        ZONE_BIT, TRANSPONDER_BIT, SPEED_BIT, MILITARY_BIT, ALTITUDE_BIT
+    )
+
 logger = logging.getLogger(__name__)
 
+# Classifications that score the military factor
+_MILITARY_CLASSES = frozenset({"fighter", "bomber", "military_drone"})
+_MILITARY_CLASSES_ARRAY = np.array(sorted(_MILITARY_CLASSES))
+
+# One row per scoring factor: (flag bit, breakdown key, weights key,
+# reason formatter over (zone_name, speed_kt, classification, altitude_ft))
+_FACTOR_EMITTERS = (
+    (ZONE_BIT, "zone", "in_restricted_zone",
+     lambda zone, spd, cls, alt: "inside_restricted_zone (%s)" % zone),
+    (TRANSPONDER_BIT, "transponder", "no_transponder",
+     lambda zone, spd, cls, alt: "unknown_transponder"),
+    (SPEED_BIT, "speed", "high_speed",
+     lambda zone, spd, cls, alt: "high_speed (%.0f kt)" % spd),
+    (MILITARY_BIT, "military", "military_classification",
+     lambda zone, spd, cls, alt: "military_classification (%s)" % cls),
+    (ALTITUDE_BIT, "altitude", "low_altitude",
+     lambda zone, spd, cls, alt: "low_altitude (%.0f ft)" % alt),
+)
+
+
+@lru_cache(maxsize=32)
+def _load_zones_cached(abs_path: str, mtime_ns: int):
+    """Parse GeoJSON zones once per (path, mtime): repeated analyzer
+    construction (tests, worker pools) shares the geometries and tree"""
+    with open(abs_path, 'r') as f:
+        geojson = json.load(f)
+
+    # Struct-of-arrays: parallel name/geometry tuples instead of a list
+    # of dicts (one lookup per zone per query instead of two)
+    names, geoms = [], []
+    if geojson.get('type') == 'FeatureCollection':
+        for feature in geojson.get('features', []):
+            geometry = shape(feature['geometry'])
+            # In-place preparation: contains_xy then runs the prepared
+            # C predicate without any Point construction
+            shapely.prepare(geometry)
+            names.append(feature.get('properties', {}).get('name', 'Unnamed Zone'))
+            geoms.append(geometry)
+
+    names, geoms = tuple(names), tuple(geoms)
+    tree = STRtree(geoms) if geoms else None
+
+    # Flatten exterior rings into SoA arrays for the compiled
+    # point-in-polygon kernel (batch path); any non-polygon geometry or a
+    # polygon with holes (the kernel only sees exterior rings) disables
+    # the fast path and the batch falls back to shapely
+    flat = None
+    if geoms and all(
+        g.geom_type == 'Polygon' and not g.interiors for g in geoms
+    ):
+        xs, ys, offsets = [], [], [0]
+        for g in geoms:
+            coords = np.asarray(g.exterior.coords)[:-1]  # drop closing vertex
+            xs.append(coords[:, 0])
+            ys.append(coords[:, 1])
+            offsets.append(offsets[-1] + len(coords))
+        flat = (
+            np.concatenate(xs), np.concatenate(ys),
+            np.array(offsets, dtype=np.int64)
+        )
+
+    return names, geoms, tree, flat
+
+
+@lru_cache(maxsize=32)
+def _load_allowlist_cached(abs_path: str, mtime_ns: int) -> frozenset:
+    """Read the allowlist CSV once per (path, mtime)
+
+    A flat one-column read doesn't warrant dragging in pandas (its import
+    alone costs more than parsing any plausible allowlist).
+    """
+    import csv
+    with open(abs_path, newline='') as f:
+        return frozenset(row['transponder_id'] for row in csv.DictReader(f))
+
 
 class ThreatAnalyzer:
     """Rule-based threat assessment with weighted scoring"""
@@ -55,54 +146,87 @@ class ThreatAnalyzer:
         """
         self.weights = weights or self.DEFAULT_WEIGHTS
         self.thresholds = thresholds or self.DEFAULT_THRESHOLDS
+
+        # Threat-level cutoffs sorted for bisect lookup
+        level_bounds = sorted(self.LEVELS.items(), key=lambda kv: kv[1][0])
+        self._level_names = tuple(name for name, _ in level_bounds)
+        self._level_cutoffs = tuple(bounds[1] for _, bounds in level_bounds[:-1])
+
+        # Factor weight vector for the batched score dot product, built on
+        # first use (constructing with unconventional weight keys only
+        # fails at assess time, matching the scalar path)
+        self._weight_vec = None
         
-        # Load restricted zones
-        self.zones = self._load_zones(zone_polygons_file) if zone_polygons_file else []
+        # Load restricted zones; an STRtree narrows containment queries to
+        # bbox-overlapping candidates before the prepared-geometry test
+        if zone_polygons_file:
+            (self._zone_names, self._zone_geoms,
+             self._zone_tree, self._zone_flat) = self._load_zones(zone_polygons_file)
+        else:
+            self._zone_names = self._zone_geoms = ()
+            self._zone_tree = self._zone_flat = None
+
+        # With no zones the containment answer is a constant: bind a no-op
+        # so each assessment skips the tree/geometry machinery entirely
+        if not self._zone_names:
+            self._check_restricted_zone = lambda world_pos: (False, None)
         
         # Load allowlist
-        self.allowlist = self._load_allowlist(allowlist_file) if allowlist_file else set()
+        self.allowlist = self._load_allowlist(allowlist_file) if allowlist_file else frozenset()
+
+        # When every ID parses as hex (Mode-S style), keep a sorted integer
+        # array too: the batch path can test membership with np.isin instead
+        # of hashing strings. The scalar path keeps the frozenset - one
+        # int() parse there costs more than one string hash.
+        self._allowlist_int = None
+        if self.allowlist:
+            try:
+                self._allowlist_int = np.sort(np.fromiter(
+                    (int(tid, 16) for tid in self.allowlist), dtype=np.int64
+                ))
+            except ValueError:
+                self._allowlist_int = None
         
-        logger.info(f"ThreatAnalyzer initialized with {len(self.zones)} zones and {len(self.allowlist)} allowed IDs")
+        # Memoized assessment over rounded inputs (see assess_threat_cached)
+        self._assess_cached = lru_cache(maxsize=4096)(self._assess_rounded)
+
+        # Pay the one-off numba compile for the scoring kernel up front
+        score_kernel(False, True, 0.0, False, 0.0, False, 0, 0, 0, 0, 0, 1.0, 1.0)
+
+        logger.info(f"ThreatAnalyzer initialized with {len(self._zone_names)} zones and {len(self.allowlist)} allowed IDs")
     
-    def _load_zones(self, file_path: str) -> List:
-        """Load restricted zones from GeoJSON"""
+    def _load_zones(self, file_path: str):
+        """Load restricted zones (and their STRtree) from GeoJSON"""
         if not Path(file_path).exists():
             logger.warning(f"Zone file not found: {file_path}")
-            return []
-        
+            return (), (), None, None
+
         try:
-            with open(file_path, 'r') as f:
-                geojson = json.load(f)
-            
-            zones = []
-            if geojson.get('type') == 'FeatureCollection':
-                for feature in geojson.get('features', []):
-                    geometry = shape(feature['geometry'])
-                    name = feature.get('properties', {}).get('name', 'Unnamed Zone')
-                    zones.append({'name': name, 'geometry': geometry})
-            
-            logger.info(f"Loaded {len(zones)} restricted zones")
-            return zones
-            
+            names, geoms, tree, flat = _load_zones_cached(
+                os.path.abspath(file_path), os.stat(file_path).st_mtime_ns
+            )
+            logger.info(f"Loaded {len(names)} restricted zones")
+            return names, geoms, tree, flat
+
         except Exception as e:
             logger.error(f"Failed to load zones: {e}")
-            return []
-    
-    def _load_allowlist(self, file_path: str) -> set:
+            return (), (), None, None
+
+    def _load_allowlist(self, file_path: str) -> frozenset:
         """Load allowed transponder IDs from CSV"""
         if not Path(file_path).exists():
             logger.warning(f"Allowlist file not found: {file_path}")
-            return set()
-        
+            return frozenset()
+
         try:
-            import pandas as pd
-            df = pd.read_csv(file_path)
-            allowlist = set(df['transponder_id'].astype(str).tolist())
+            allowlist = _load_allowlist_cached(
+                os.path.abspath(file_path), os.stat(file_path).st_mtime_ns
+            )
             logger.info(f"Loaded {len(allowlist)} allowed transponder IDs")
             return allowlist
         except Exception as e:
             logger.error(f"Failed to load allowlist: {e}")
-            return set()
+            return frozenset()
     
     def assess_threat(
         self,
@@ -110,7 +234,8 @@ class ThreatAnalyzer:
         speed_kt: float,
         classification: str,
         transponder_id: Optional[str] = None,
-        altitude_ft: Optional[float] = None
+        altitude_ft: Optional[float] = None,
+        include_reasons: bool = True
     ) -> Dict:
         """
         Assess threat level for an aircraft
@@ -121,6 +246,8 @@ class ThreatAnalyzer:
             classification: Aircraft class (fighter, airliner, etc.)
             transponder_id: Transponder ID (None if unknown)
             altitude_ft: Altitude in feet (optional)
+            include_reasons: Skip the reason-string formatting when the
+                caller only needs score/level/breakdown
             
         Returns:
             Dictionary with:
@@ -129,44 +256,43 @@ class ThreatAnalyzer:
             - reasons: List of contributing factors
             - breakdown: Score breakdown by factor
         """
-        score = 0
+        # Hoist the per-call attribute/dict lookups once
+        weights = self.weights
+        thresholds = self.thresholds
+        allowlist = self.allowlist
+
+        # The string/geometry work stays in Python; the branch arithmetic
+        # runs in the compiled kernel, which reports which factors fired
+        in_zone, zone_name = self._check_restricted_zone(world_pos)
+        # An empty allowlist can never match; skip the hash
+        transponder_ok = bool(transponder_id) and bool(allowlist) and \
+            transponder_id in allowlist
+        is_military = classification in _MILITARY_CLASSES
+
+        score, flags = score_kernel(
+            in_zone, transponder_ok, float(speed_kt), is_military,
+            float(altitude_ft) if altitude_ft is not None else 0.0,
+            altitude_ft is not None,
+            weights["in_restricted_zone"], weights["no_transponder"],
+            weights["high_speed"], weights["military_classification"],
+            weights["low_altitude"],
+            float(thresholds["high_speed_kt"]), float(thresholds["low_altitude_ft"])
+        )
+
+        # Single emit pass over the factor table, driven by the bitmask
         reasons = []
         breakdown = {}
-        
-        # Factor 1: In restricted zone
-        in_zone, zone_name = self._check_restricted_zone(world_pos)
-        if in_zone:
-            score += self.weights["in_restricted_zone"]
-            reasons.append(f"inside_restricted_zone ({zone_name})")
-            breakdown["zone"] = self.weights["in_restricted_zone"]
-        
-        # Factor 2: No/unknown transponder
-        if not transponder_id or transponder_id not in self.allowlist:
-            score += self.weights["no_transponder"]
-            reasons.append("unknown_transponder")
-            breakdown["transponder"] = self.weights["no_transponder"]
-        
-        # Factor 3: High speed
-        if speed_kt > self.thresholds["high_speed_kt"]:
-            score += self.weights["high_speed"]
-            reasons.append(f"high_speed ({speed_kt:.0f} kt)")
-            breakdown["speed"] = self.weights["high_speed"]
-        
-        # Factor 4: Military classification
-        if classification in ["fighter", "bomber", "military_drone"]:
-            score += self.weights["military_classification"]
-            reasons.append(f"military_classification ({classification})")
-            breakdown["military"] = self.weights["military_classification"]
-        
-        # Factor 5: Low altitude in zone
-        if in_zone and altitude_ft is not None and altitude_ft < self.thresholds["low_altitude_ft"]:
-            score += self.weights["low_altitude"]
-            reasons.append(f"low_altitude ({altitude_ft:.0f} ft)")
-            breakdown["altitude"] = self.weights["low_altitude"]
-        
+        for bit, key, weight_key, format_reason in _FACTOR_EMITTERS:
+            if flags & bit:
+                breakdown[key] = weights[weight_key]
+                if include_reasons:
+                    reasons.append(format_reason(
+                        zone_name, speed_kt, classification, altitude_ft
+                    ))
+
         # Determine threat level
         level = self._get_threat_level(score)
-        
+
         return {
             "score": int(score),
             "level": level,
@@ -174,6 +300,180 @@ class ThreatAnalyzer:
             "breakdown": breakdown
         }
     
+    def assess_threat_cached(
+        self,
+        world_pos: Tuple[float, float],
+        speed_kt: float,
+        classification: str,
+        transponder_id: Optional[str] = None,
+        altitude_ft: Optional[float] = None
+    ) -> Dict:
+        """
+        Memoized assess_threat for slow-moving/hovering tracks
+
+        Inputs are rounded before keying the cache (position to 1 m,
+        speed to 1 kt, altitude to 100 ft), so consecutive frames of a
+        near-stationary aircraft become a dict lookup. Positions within
+        ~1 m of a zone edge may therefore score against the rounded
+        position. Returned dicts are shared - treat them as read-only.
+        """
+        return self._assess_cached(
+            round(world_pos[0]), round(world_pos[1]), round(speed_kt),
+            classification, transponder_id,
+            None if altitude_ft is None else round(altitude_ft, -2)
+        )
+
+    def _assess_rounded(self, x, y, speed_kt, classification, transponder_id, altitude_ft):
+        """Cacheable core behind assess_threat_cached"""
+        return self.assess_threat(
+            (x, y), speed_kt, classification,
+            transponder_id=transponder_id, altitude_ft=altitude_ft
+        )
+
+    def assess_threat_batch(
+        self,
+        world_pos,
+        speeds_kt,
+        classifications,
+        transponder_ids: Optional[List[Optional[str]]] = None,
+        altitudes_ft: Optional[List[Optional[float]]] = None
+    ) -> List[Dict]:
+        """
+        Assess threat levels for many aircraft in one vectorized pass
+
+        The scoring factors are evaluated as boolean arrays and combined
+        with a single weight sum; only zone containment and the per-item
+        reasons/breakdown emission still loop.
+
+        Args:
+            world_pos: (N, 2) array-like of world positions in meters
+            speeds_kt: N speeds in knots
+            classifications: N class labels
+            transponder_ids: N transponder IDs (None entries allowed)
+            altitudes_ft: N altitudes in feet (None entries allowed)
+
+        Returns:
+            List of N result dicts in assess_threat's format
+        """
+        n = len(speeds_kt)
+        world_pos = np.asarray(world_pos, dtype=np.float64).reshape(n, 2)
+        speeds = np.asarray(speeds_kt, dtype=np.float64)
+        if transponder_ids is None:
+            transponder_ids = [None] * n
+        if altitudes_ft is None:
+            altitudes_ft = [None] * n
+
+        # Zone containment: compiled crossing-number kernel over the
+        # flattened rings; shapely per point only for exotic geometries
+        in_zone = np.zeros(n, dtype=bool)
+        zone_names: List[Optional[str]] = [None] * n
+        if self._zone_names:
+            if self._zone_flat is not None:
+                xs, ys, offsets = self._zone_flat
+                zone_idx = np.empty(n, dtype=np.int64)
+                points_in_polygons(
+                    xs, ys, offsets,
+                    np.ascontiguousarray(world_pos[:, 0]),
+                    np.ascontiguousarray(world_pos[:, 1]),
+                    zone_idx
+                )
+                in_zone = zone_idx >= 0
+                for i in range(n):
+                    if zone_idx[i] >= 0:
+                        zone_names[i] = self._zone_names[zone_idx[i]]
+            else:
+                # Exotic (non-polygon) zones: one bulk tree query with the
+                # within predicate instead of N Python-level containment
+                # calls; ties resolve to the lowest zone index to keep
+                # first-match priority
+                points = shapely.points(world_pos[:, 0], world_pos[:, 1])
+                pairs = self._zone_tree.query(points, predicate='within')
+                zone_idx = np.full(n, -1, dtype=np.int64)
+                if pairs.size:
+                    for k in np.lexsort((pairs[1], pairs[0])):
+                        point_i = pairs[0][k]
+                        if zone_idx[point_i] == -1:
+                            zone_idx[point_i] = pairs[1][k]
+                in_zone = zone_idx >= 0
+                for i in range(n):
+                    if zone_idx[i] >= 0:
+                        zone_names[i] = self._zone_names[zone_idx[i]]
+
+        if self._allowlist_int is not None:
+            # All-hex allowlist: integer membership via np.isin
+            codes = np.zeros(n, dtype=np.int64)
+            parseable = np.zeros(n, dtype=bool)
+            for i, tid in enumerate(transponder_ids):
+                if tid:
+                    try:
+                        codes[i] = int(tid, 16)
+                        parseable[i] = True
+                    except ValueError:
+                        pass
+            allowed = np.zeros(n, dtype=bool)
+            if parseable.any():
+                allowed[parseable] = np.isin(codes[parseable], self._allowlist_int)
+            # Integer compare canonicalizes case; confirm the (rare) hits
+            # against the string set so semantics stay exactly the same
+            for i in np.nonzero(allowed)[0]:
+                if transponder_ids[i] not in self.allowlist:
+                    allowed[i] = False
+            no_transponder = ~allowed
+        else:
+            no_transponder = np.array(
+                [not tid or tid not in self.allowlist for tid in transponder_ids]
+            )
+        high_speed = speeds > self.thresholds["high_speed_kt"]
+        military = np.isin(np.asarray(classifications), _MILITARY_CLASSES_ARRAY)
+        altitudes = np.array(
+            [np.nan if a is None else a for a in altitudes_ft], dtype=np.float64
+        )
+        low_altitude = in_zone & ~np.isnan(altitudes) & \
+            (altitudes < self.thresholds["low_altitude_ft"])
+
+        weights = self.weights
+        if self._weight_vec is None:
+            # Order: zone, transponder, speed, military, altitude
+            self._weight_vec = np.array([
+                weights["in_restricted_zone"],
+                weights["no_transponder"],
+                weights["high_speed"],
+                weights["military_classification"],
+                weights["low_altitude"]
+            ], dtype=np.int64)
+
+        factors = np.stack([in_zone, no_transponder, high_speed, military, low_altitude])
+        scores = self._weight_vec @ factors
+
+        results = []
+        for i in range(n):
+            reasons = []
+            breakdown = {}
+            if in_zone[i]:
+                reasons.append(f"inside_restricted_zone ({zone_names[i]})")
+                breakdown["zone"] = weights["in_restricted_zone"]
+            if no_transponder[i]:
+                reasons.append("unknown_transponder")
+                breakdown["transponder"] = weights["no_transponder"]
+            if high_speed[i]:
+                reasons.append(f"high_speed ({speeds[i]:.0f} kt)")
+                breakdown["speed"] = weights["high_speed"]
+            if military[i]:
+                reasons.append(f"military_classification ({classifications[i]})")
+                breakdown["military"] = weights["military_classification"]
+            if low_altitude[i]:
+                reasons.append(f"low_altitude ({altitudes[i]:.0f} ft)")
+                breakdown["altitude"] = weights["low_altitude"]
+
+            results.append({
+                "score": int(scores[i]),
+                "level": self._get_threat_level(int(scores[i])),
+                "reasons": reasons,
+                "breakdown": breakdown
+            })
+
+        return results
+
     def _check_restricted_zone(self, world_pos: Tuple[float, float]) -> Tuple[bool, Optional[str]]:
         """
         Check if position is in any restricted zone
@@ -184,15 +484,18 @@ class ThreatAnalyzer:
         Returns:
             Tuple of (in_zone, zone_name)
         """
-        if not self.zones:
+        if not self._zone_names:
             return False, None
-        
-        point = Point(world_pos[0], world_pos[1])
-        
-        for zone in self.zones:
-            if zone['geometry'].contains(point):
-                return True, zone['name']
-        
+
+        x, y = world_pos[0], world_pos[1]
+
+        # Tree query yields bbox candidates; sorted so overlapping zones
+        # keep the original first-match priority. contains_xy skips the
+        # per-predicate Point allocation (geometries are prepared at load)
+        for index in sorted(self._zone_tree.query(Point(x, y))):
+            if shapely.contains_xy(self._zone_geoms[index], x, y):
+                return True, self._zone_names[index]
+
         return False, None
     
     def _get_threat_level(self, score: int) -> str:
@@ -205,12 +508,8 @@ class ThreatAnalyzer:
         Returns:
             Threat level string
         """
-        for level, (min_score, max_score) in self.LEVELS.items():
-            if min_score <= score < max_score:
-                return level
-        
-        # If score >= 70
-        return "Critical"
+        # Two comparisons via bisect instead of iterating LEVELS per call
+        return self._level_names[bisect.bisect_right(self._level_cutoffs, score)]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+"""
+Numba-compiled scoring kernels for the threat analyzer
+"""
+from numba import njit
+
+# Factor bit positions in the flags bitmask returned by score_kernel
+ZONE_BIT = 1
+TRANSPONDER_BIT = 2
+SPEED_BIT = 4
+MILITARY_BIT = 8
+ALTITUDE_BIT = 16
+
+
+@njit
+def point_in_polygons(xs, ys, offsets, px, py):
+    """
+    Crossing-number point-in-polygon over flattened exterior rings.
+
+    xs/ys hold every polygon's exterior vertices back to back; offsets[p]
+    .. offsets[p+1] delimits polygon p. Holes are ignored (restricted
+    zones are simple polygons). Returns the first containing polygon's
+    index, or -1.
+    """
+    n_polys = offsets.shape[0] - 1
+    for p in range(n_polys):
+        start = offsets[p]
+        end = offsets[p + 1]
+        inside = False
+        j = end - 1
+        for i in range(start, end):
+            if ((ys[i] > py) != (ys[j] > py)) and (
+                px < (xs[j] - xs[i]) * (py - ys[i]) / (ys[j] - ys[i]) + xs[i]
+            ):
+                inside = not inside
+            j = i
+        if inside:
+            return p
+    return -1
+
+
+@njit
+def points_in_polygons(xs, ys, offsets, pxs, pys, out):
+    """Vectorized form: writes each point's containing-zone index into out"""
+    for k in range(pxs.shape[0]):
+        out[k] = point_in_polygons(xs, ys, offsets, pxs[k], pys[k])
+
+
+# No on-disk cache: the module is importable both as src.threat_kernels and
+# (script mode) threat_kernels, and numba's cache trips over the dual identity
+@njit
+def score_kernel(
+    in_zone, transponder_ok, speed_kt, is_military, altitude_ft, has_altitude,
+    w_zone, w_trans, w_speed, w_mil, w_alt, t_speed, t_alt
+):
+    """
+    Scalar scoring core: all branch arithmetic compiled to machine code.
+
+    Returns:
+        (score, flags) where flags is a bitmask of the factors that fired
+    """
+    score = 0
+    flags = 0
+
+    if in_zone:
+        score += w_zone
+        flags |= ZONE_BIT
+    if not transponder_ok:
+        score += w_trans
+        flags |= TRANSPONDER_BIT
+    if speed_kt > t_speed:
+        score += w_speed
+        flags |= SPEED_BIT
+    if is_military:
+        score += w_mil
+        flags |= MILITARY_BIT
+    if in_zone and has_altitude and altitude_ft < t_alt:
+        score += w_alt
+        flags |= ALTITUDE_BIT
+
+    return score, flags
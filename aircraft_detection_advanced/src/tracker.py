@@ -2,12 +2,48 @@
 Multi-object tracker wrapper (ByteTrack / Norfair)
 """
 import numpy as np
+from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TrackBatch:
+    """
+    Struct-of-arrays view of one frame's tracks
+
+    Bulk consumers (reductions, batched transforms) read the contiguous
+    columns directly; to_dicts() gives the per-track dict view that
+    Tracker.update returns.
+    """
+    ids: np.ndarray
+    xyxy: np.ndarray
+    confidence: np.ndarray
+    class_id: np.ndarray
+    centroids: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_dicts(self) -> List[Dict]:
+        """Per-track dicts in Tracker.update's format"""
+        return [
+            {
+                'id': int(track_id),
+                'bbox': bbox,
+                'confidence': float(conf),
+                'class_id': int(cls),
+                'centroid': centroid
+            }
+            for track_id, bbox, conf, cls, centroid in zip(
+                self.ids.tolist(), self.xyxy.tolist(), self.confidence.tolist(),
+                self.class_id.tolist(), self.centroids.tolist()
+            )
+        ]
+
+
 class Tracker:
     """Multi-object tracker wrapper"""
     
@@ -48,7 +84,13 @@ class Tracker:
         """Initialize ByteTrack via supervision library"""
         try:
             from supervision import ByteTrack as SupervisionByteTrack
-            
+            from supervision import Detections as SupervisionDetections
+
+            # Cache the class (and the empty sentinel fed on detection-less
+            # frames) so the per-frame update path skips the import machinery
+            self._SvDetections = SupervisionDetections
+            self._sv_empty = SupervisionDetections.empty()
+
             self.tracker = SupervisionByteTrack(
                 lost_track_buffer=self.track_buffer,
                 track_activation_threshold=self.match_threshold,
@@ -64,8 +106,11 @@ class Tracker:
         """Initialize Norfair tracker"""
         try:
             from norfair import Tracker as NorfairTracker
+            from norfair import Detection as NorfairDetection
             from norfair.distances import mean_euclidean
-            
+
+            self._NorfairDetection = NorfairDetection
+
             self.tracker = NorfairTracker(
                 distance_function=mean_euclidean,
                 distance_threshold=self.max_distance,
@@ -103,86 +148,155 @@ class Tracker:
                 ...
             ]
         """
+        detections = self._normalize_detections(detections)
+
         if self.method == "bytetrack":
             return self._update_bytetrack(detections)
         elif self.method == "norfair":
             return self._update_norfair(detections)
+
+    @staticmethod
+    def _normalize_detections(detections):
+        """Cast inputs once: pixel coordinates don't need float64, and
+        halving bytes per value halves tracker memory traffic"""
+        bboxes, confidences, class_ids = detections
+        if len(bboxes):
+            bboxes = np.ascontiguousarray(bboxes, dtype=np.float32)
+            confidences = np.asarray(confidences, dtype=np.float32)
+            class_ids = np.asarray(class_ids, dtype=np.int32)
+        return bboxes, confidences, class_ids
     
+    def update_batch(
+        self,
+        detections: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    ) -> TrackBatch:
+        """
+        Update tracker and return the frame's tracks as SoA arrays
+
+        Same input contract as update(); bulk consumers avoid the dict
+        materialization entirely.
+        """
+        detections = self._normalize_detections(detections)
+
+        if self.method == "bytetrack":
+            tracked = self._run_bytetrack(detections)
+            count = len(tracked) if tracked is not None else 0
+            if count == 0:
+                empty2 = np.empty((0, 2))
+                return TrackBatch(
+                    np.empty(0, dtype=np.int64), np.empty((0, 4)),
+                    np.empty(0), np.empty(0, dtype=np.int64), empty2
+                )
+
+            xyxy = tracked.xyxy
+            return TrackBatch(
+                ids=tracked.tracker_id if tracked.tracker_id is not None
+                    else np.arange(count, dtype=np.int64),
+                xyxy=xyxy,
+                confidence=tracked.confidence if tracked.confidence is not None
+                    else np.ones(count),
+                class_id=tracked.class_id if tracked.class_id is not None
+                    else np.zeros(count, dtype=np.int64),
+                centroids=(xyxy[:, :2] + xyxy[:, 2:]) * 0.5
+            )
+
+        # Norfair path: pack the dict results into columns
+        results = self._update_norfair(detections)
+        if not results:
+            return TrackBatch(
+                np.empty(0, dtype=np.int64), np.empty((0, 4)),
+                np.empty(0), np.empty(0, dtype=np.int64), np.empty((0, 2))
+            )
+        return TrackBatch(
+            ids=np.array([r['id'] for r in results], dtype=np.int64),
+            xyxy=np.array([r['bbox'] for r in results]),
+            confidence=np.array([r['confidence'] for r in results]),
+            class_id=np.array([r['class_id'] for r in results], dtype=np.int64),
+            centroids=np.array([r['centroid'] for r in results])
+        )
+
     def _update_bytetrack(
         self,
         detections: Tuple[np.ndarray, np.ndarray, np.ndarray]
     ) -> List[Dict]:
         """Update ByteTrack"""
-        from supervision import Detections as SupervisionDetections
-        
-        bboxes, confidences, class_ids = detections
-        
-        if len(bboxes) == 0:
-            # Update with empty detections to age out tracks
-            empty_dets = SupervisionDetections.empty()
-            self.tracker.update_with_detections(empty_dets)
+        tracked_detections = self._run_bytetrack(detections)
+        if tracked_detections is None:
             return []
-        
-        # Convert to supervision Detections format
-        sv_detections = SupervisionDetections(
-            xyxy=bboxes,
-            confidence=confidences,
-            class_id=class_ids
+
+        # Convert to our format: batch the numpy->Python conversions once
+        # instead of per-row scalar casts
+        count = len(tracked_detections)
+        xyxy = tracked_detections.xyxy
+        centroids = ((xyxy[:, :2] + xyxy[:, 2:]) * 0.5).tolist()
+        bbox_lists = xyxy.tolist()
+        track_ids = (
+            tracked_detections.tracker_id.tolist()
+            if tracked_detections.tracker_id is not None else list(range(count))
         )
-        
-        # Update tracker
-        tracked_detections = self.tracker.update_with_detections(sv_detections)
-        
-        # Convert to our format
-        results = []
-        for i in range(len(tracked_detections)):
-            bbox = tracked_detections.xyxy[i]
-            track_id = tracked_detections.tracker_id[i] if tracked_detections.tracker_id is not None else i
-            confidence = tracked_detections.confidence[i] if tracked_detections.confidence is not None else 1.0
-            class_id = tracked_detections.class_id[i] if tracked_detections.class_id is not None else 0
-            
-            # Calculate centroid
-            cx = (bbox[0] + bbox[2]) / 2
-            cy = (bbox[1] + bbox[3]) / 2
-            
-            results.append({
+        conf_list = (
+            tracked_detections.confidence.tolist()
+            if tracked_detections.confidence is not None else [1.0] * count
+        )
+        class_list = (
+            tracked_detections.class_id.tolist()
+            if tracked_detections.class_id is not None else [0] * count
+        )
+
+        return [
+            {
                 'id': int(track_id),
-                'bbox': bbox.tolist(),
+                'bbox': bbox,
                 'confidence': float(confidence),
                 'class_id': int(class_id),
-                'centroid': [float(cx), float(cy)]
-            })
-        
-        return results
+                'centroid': centroid
+            }
+            for track_id, bbox, confidence, class_id, centroid
+            in zip(track_ids, bbox_lists, conf_list, class_list, centroids)
+        ]
     
+    def _run_bytetrack(self, detections):
+        """Feed detections through ByteTrack; None when nothing came back"""
+        bboxes, confidences, class_ids = detections
+
+        if len(bboxes) == 0:
+            # Update with empty detections to age out tracks
+            self.tracker.update_with_detections(self._sv_empty)
+            return None
+
+        sv_detections = self._SvDetections(
+            xyxy=np.asarray(bboxes),
+            confidence=np.asarray(confidences),
+            class_id=np.asarray(class_ids)
+        )
+        return self.tracker.update_with_detections(sv_detections)
+
     def _update_norfair(
         self,
         detections: Tuple[np.ndarray, np.ndarray, np.ndarray]
     ) -> List[Dict]:
         """Update Norfair"""
-        from norfair import Detection as NorfairDetection
-        
         bboxes, confidences, class_ids = detections
-        
+
         if len(bboxes) == 0:
             # Update with empty detections
             self.tracker.update([])
             return []
-        
-        # Convert to Norfair Detection format
-        norfair_dets = []
-        for bbox, conf, cls_id in zip(bboxes, confidences, class_ids):
-            # Norfair uses centroids
-            cx = (bbox[0] + bbox[2]) / 2
-            cy = (bbox[1] + bbox[3]) / 2
-            
-            norfair_dets.append(
-                NorfairDetection(
-                    points=np.array([[cx, cy]]),
-                    scores=np.array([conf]),
-                    data={'bbox': bbox, 'class_id': cls_id}
-                )
+
+        # All centroids in one vector expression; Detection objects are
+        # built over preallocated row views instead of per-item arrays
+        bboxes = np.asarray(bboxes)
+        centroids = ((bboxes[:, :2] + bboxes[:, 2:]) * 0.5).reshape(-1, 1, 2)
+        scores = np.asarray(confidences).reshape(-1, 1)
+
+        norfair_dets = [
+            self._NorfairDetection(
+                points=centroids[i],
+                scores=scores[i],
+                data={'bbox': bboxes[i], 'class_id': class_ids[i]}
             )
+            for i in range(len(bboxes))
+        ]
         
         # Update tracker
         tracked_objects = self.tracker.update(detections=norfair_dets)
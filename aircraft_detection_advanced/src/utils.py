@@ -3,12 +3,17 @@ Utility functions for aircraft detection system
 """
 import cv2
 import numpy as np
+from numba import njit
 import json
+import queue
+import threading
 from pathlib import Path
 from typing import List, Tuple, Dict, Any, Optional
 from datetime import datetime
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 def setup_logging(level: str = "INFO", log_file: Optional[str] = None):
     """
@@ -67,39 +72,131 @@ def draw_bbox(
     Returns:
         Annotated frame
     """
-    x1, y1, x2, y2 = map(int, bbox)
-    
-    # Draw box
-    cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
-    
-    # Draw label background
-    if label or confidence is not None:
-        text = label
-        if confidence is not None:
-            text = f"{label} {confidence:.2f}" if label else f"{confidence:.2f}"
-        
-        (text_width, text_height), baseline = cv2.getTextSize(
-            text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1
-        )
-        
-        cv2.rectangle(
-            frame,
-            (x1, y1 - text_height - baseline - 5),
-            (x1 + text_width, y1),
-            color,
-            -1
-        )
-        
-        cv2.putText(
-            frame,
-            text,
-            (x1, y1 - baseline - 5),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (255, 255, 255),
-            1
-        )
-    
+    return draw_bboxes_batch(
+        frame, np.asarray([bbox]), [label], [color],
+        None if confidence is None else [confidence], thickness
+    )
+
+
+def draw_bboxes_batch(
+    frame: np.ndarray,
+    bboxes: np.ndarray,
+    labels: List[str],
+    colors,
+    confidences=None,
+    thickness: int = 2
+) -> np.ndarray:
+    """
+    Draw labelled bounding boxes for a whole frame in one pass
+
+    One astype/tolist pair converts every coordinate together and the
+    label texts come from a single comprehension, so per-box Python work
+    reduces to the cv2 calls themselves. colors accepts tuples or the
+    raw uint8 rows from get_threat_colors.
+
+    Args:
+        frame: Input frame
+        bboxes: (N, 4) boxes [x1, y1, x2, y2]
+        labels: N text labels ('' draws no label)
+        colors: N BGR colors
+        confidences: Optional N confidence scores appended to the labels
+        thickness: Line thickness
+
+    Returns:
+        Annotated frame
+    """
+    if len(bboxes) == 0:
+        return frame
+
+    boxes = np.asarray(bboxes).astype(np.int32, copy=False).tolist()
+    colors = np.asarray(colors).astype(np.int32, copy=False).tolist()
+    if confidences is None:
+        texts = list(labels)
+    else:
+        texts = [
+            f"{label} {conf:.2f}" if label else f"{conf:.2f}"
+            for label, conf in zip(labels, confidences)
+        ]
+
+    for (x1, y1, x2, y2), text, color in zip(boxes, texts, colors):
+        color = tuple(color)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
+        if text:
+            draw_label(frame, text, (x1, y1), color)
+
+    return frame
+
+
+@njit(cache=True)
+def _draw_rect_edges(frame, rects, thickness):
+    """Draw all rectangle outlines with slice writes in one compiled pass"""
+    height, width = frame.shape[:2]
+    for i in range(rects.shape[0]):
+        x1 = max(0, rects[i, 0])
+        y1 = max(0, rects[i, 1])
+        x2 = min(width, rects[i, 2])
+        y2 = min(height, rects[i, 3])
+        if x2 <= x1 or y2 <= y1:
+            continue
+        for c in range(3):
+            value = np.uint8(rects[i, 4 + c])
+            frame[y1:min(y1 + thickness, y2), x1:x2, c] = value
+            frame[max(y2 - thickness, y1):y2, x1:x2, c] = value
+            frame[y1:y2, x1:min(x1 + thickness, x2), c] = value
+            frame[y1:y2, max(x2 - thickness, x1):x2, c] = value
+
+
+def draw_bboxes(frame: np.ndarray, rects: np.ndarray, thickness: int = 2) -> np.ndarray:
+    """
+    Draw many bounding-box outlines in a single compiled pass
+
+    Args:
+        frame: Input frame
+        rects: (N, 7) int32 rows of [x1, y1, x2, y2, b, g, r]
+        thickness: Edge thickness
+
+    Returns:
+        Annotated frame
+    """
+    if len(rects):
+        _draw_rect_edges(frame, np.ascontiguousarray(rects, dtype=np.int32), thickness)
+    return frame
+
+
+def draw_label(
+    frame: np.ndarray,
+    text: str,
+    anchor: Tuple[int, int],
+    color: Tuple[int, int, int]
+) -> np.ndarray:
+    """
+    Draw a filled label background with white text above an anchor point
+    (the label style draw_bbox uses above a box corner)
+    """
+    x1, y1 = anchor
+
+    (text_width, text_height), baseline = cv2.getTextSize(
+        text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1
+    )
+
+    cv2.rectangle(
+        frame,
+        (x1, y1 - text_height - baseline - 5),
+        (x1 + text_width, y1),
+        color,
+        -1
+    )
+
+    cv2.putText(
+        frame,
+        text,
+        (x1, y1 - baseline - 5),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.5,
+        (255, 255, 255),
+        1
+    )
+
     return frame
 
 
@@ -174,9 +271,10 @@ def crop_bbox(frame: np.ndarray, bbox: Tuple[int, int, int, int]) -> np.ndarray:
     Args:
         frame: Input frame
         bbox: Bounding box (x1, y1, x2, y2)
-        
+
     Returns:
-        Cropped image
+        Cropped image as a zero-copy view into the frame (the classifier's
+        preprocessing materializes it once, directly at its resized slot)
     """
     x1, y1, x2, y2 = map(int, bbox)
     h, w = frame.shape[:2]
@@ -190,14 +288,18 @@ def crop_bbox(frame: np.ndarray, bbox: Tuple[int, int, int, int]) -> np.ndarray:
     return frame[y1:y2, x1:x2]
 
 
+# Knots per meter-per-second
+_KNOTS_PER_MPS = 1.94384
+
+
 def mps_to_knots(speed_mps: float) -> float:
     """Convert meters per second to knots"""
-    return speed_mps * 1.94384
+    return speed_mps * _KNOTS_PER_MPS
 
 
 def knots_to_mps(speed_kt: float) -> float:
     """Convert knots to meters per second"""
-    return speed_kt / 1.94384
+    return speed_kt / _KNOTS_PER_MPS
 
 
 def meters_to_feet(meters: float) -> float:
@@ -210,23 +312,40 @@ def feet_to_meters(feet: float) -> float:
     return feet / 3.28084
 
 
+# Threat level -> BGR color, as an integer-indexed LUT so bulk annotation
+# paths fetch rows with a single array index (row 4 = unknown-level white)
+_THREAT_COLORS = np.array([
+    [0, 255, 0],      # Low: green
+    [0, 255, 255],    # Medium: yellow
+    [0, 165, 255],    # High: orange
+    [0, 0, 255],      # Critical: red
+    [255, 255, 255],  # fallback: white
+], dtype=np.uint8)
+
+LEVEL_TO_IDX = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
+
+
 def get_threat_color(level: str) -> Tuple[int, int, int]:
     """
     Get color for threat level (BGR format)
-    
+
     Args:
         level: Threat level (Low, Medium, High, Critical)
-        
+
     Returns:
         BGR color tuple
     """
-    colors = {
-        "Low": (0, 255, 0),      # Green
-        "Medium": (0, 255, 255),  # Yellow
-        "High": (0, 165, 255),    # Orange
-        "Critical": (0, 0, 255)   # Red
-    }
-    return colors.get(level, (255, 255, 255))  # White default
+    return tuple(_THREAT_COLORS[LEVEL_TO_IDX.get(level, 4)].tolist())
+
+
+def get_threat_colors(levels: List[str]) -> np.ndarray:
+    """
+    Threat colors for many levels at once
+
+    Returns:
+        (N, 3) uint8 BGR rows, directly usable by batched drawing code
+    """
+    return _THREAT_COLORS[[LEVEL_TO_IDX.get(level, 4) for level in levels]]
 
 
 def format_timestamp(dt: Optional[datetime] = None) -> str:
@@ -269,13 +388,17 @@ class VideoWriter:
         ensure_dir(str(Path(output_path).parent))
     
     def __enter__(self):
-        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-        self.writer = cv2.VideoWriter(
-            self.output_path,
-            fourcc,
-            self.fps,
-            self.frame_size
-        )
+        # avc1 first (H.264, hardware-encodable where the build supports
+        # it), mp4v as the portable fallback
+        for codec in ('avc1', 'mp4v'):
+            self.writer = cv2.VideoWriter(
+                self.output_path,
+                cv2.VideoWriter_fourcc(*codec),
+                self.fps,
+                self.frame_size
+            )
+            if self.writer.isOpened():
+                break
         return self
     
     def write(self, frame: np.ndarray):
@@ -291,36 +414,165 @@ class VideoWriter:
 class VideoReader:
     """Context manager for video reading"""
     
-    def __init__(self, video_path: str):
+    def __init__(
+        self,
+        video_path: str,
+        decode_device: str = "cpu",
+        hw_accel: bool = True,
+        prefetch: int = 4
+    ):
         """
         Initialize video reader
-        
+
         Args:
             video_path: Input video file path
+            decode_device: 'cuda' decodes on the GPU's NVDEC engine (falls
+                back to CPU when cv2.cudacodec is unavailable)
+            hw_accel: Ask FFmpeg for a hardware decoder (NVDEC/VAAPI/...)
+                with software fallback; ignored on OpenCV builds without
+                the acceleration properties
+            prefetch: Decode ahead on a background thread, keeping up to
+                this many frames queued so read() rarely blocks on the
+                decoder; 0 reads synchronously
         """
         self.video_path = video_path
+        self.decode_device = decode_device
+        self.hw_accel = hw_accel
+        self.prefetch = prefetch
         self.cap = None
+        self.gpu_reader = None
         self.fps = None
         self.frame_count = None
         self.frame_size = None
-    
+        self._queue = None
+        self._reader_thread = None
+        self._stop = None
+        self._eof = False
+        self._batch_buf = None
+
     def __enter__(self):
-        self.cap = cv2.VideoCapture(self.video_path)
+        # Metadata always comes from VideoCapture (cudacodec exposes less).
+        # The acceleration hint only takes effect as an open parameter, not
+        # via a post-open set(); VIDEO_ACCELERATION_ANY keeps the software
+        # fallback when no hardware decoder exists.
+        if self.hw_accel and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            self.cap = cv2.VideoCapture(
+                self.video_path, cv2.CAP_FFMPEG,
+                [
+                    cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                    cv2.CAP_PROP_HW_ACCELERATION_USE_OPENCL, 1
+                ]
+            )
+        else:
+            self.cap = cv2.VideoCapture(self.video_path, cv2.CAP_FFMPEG)
+        if not self.cap.isOpened():
+            # FFMPEG-less builds: retry with backend auto-detection
+            self.cap = cv2.VideoCapture(self.video_path)
         if not self.cap.isOpened():
             raise ValueError(f"Cannot open video: {self.video_path}")
-        
+
         self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
         self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
         width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.frame_size = (width, height)
-        
+
+        if self.decode_device == "cuda":
+            try:
+                self.gpu_reader = cv2.cudacodec.createVideoReader(self.video_path)
+                self.cap.release()
+                self.cap = None
+                logger.info("Decoding on NVDEC (cv2.cudacodec)")
+            except Exception as e:
+                logger.warning(f"NVDEC decode unavailable ({e}); using CPU decode")
+                self.gpu_reader = None
+
+        if self.prefetch:
+            self._queue = queue.Queue(maxsize=self.prefetch)
+            self._stop = threading.Event()
+            self._reader_thread = threading.Thread(
+                target=self._reader_loop, daemon=True
+            )
+            self._reader_thread.start()
+
         return self
-    
-    def read(self) -> Tuple[bool, np.ndarray]:
-        """Read next frame"""
+
+    def _read_direct(self) -> Tuple[bool, np.ndarray]:
+        """Decode the next frame on the calling thread"""
+        if self.gpu_reader is not None:
+            ret, gpu_frame = self.gpu_reader.nextFrame()
+            if not ret:
+                return False, None
+            # NVDEC hands back BGRA on the device; the CPU stages of the
+            # pipeline still consume host BGR frames
+            frame = gpu_frame.download()
+            return True, cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
         return self.cap.read()
-    
+
+    def _reader_loop(self):
+        """Producer: decode ahead of the consumer into the bounded queue"""
+        while not self._stop.is_set():
+            item = self._read_direct()
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if not item[0]:
+                break
+
+    def read(self) -> Tuple[bool, np.ndarray]:
+        """Read next frame (BGR, host memory)"""
+        if self._reader_thread is None:
+            return self._read_direct()
+        if self._eof:
+            return False, None
+        ret, frame = self._queue.get()
+        if not ret:
+            self._eof = True
+        return ret, frame
+
+    def read_batch(self, n: int) -> Tuple[int, np.ndarray]:
+        """
+        Read up to n consecutive frames stacked into one array
+
+        Feeds batch-size>1 detector inference: one forward pass over the
+        returned tensor instead of n single-frame passes.
+
+        Returns:
+            (count, batch): batch is a (count, H, W, 3) uint8 view into a
+            buffer reused by the next read_batch call, so consume or copy
+            it first. count < n at the stream tail, 0 at EOF.
+        """
+        width, height = self.frame_size
+        if (
+            self._batch_buf is None
+            or self._batch_buf.shape[0] < n
+            or self._batch_buf.shape[1:3] != (height, width)
+        ):
+            self._batch_buf = np.empty((n, height, width, 3), dtype=np.uint8)
+
+        count = 0
+        for i in range(n):
+            ret, frame = self.read()
+            if not ret:
+                break
+            self._batch_buf[i] = frame
+            count += 1
+        return count, self._batch_buf[:count]
+
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._reader_thread is not None:
+            self._stop.set()
+            # Unblock a producer waiting on a full queue
+            try:
+                while True:
+                    self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._reader_thread.join()
+            self._reader_thread = None
         if self.cap is not None:
             self.cap.release()
+        self.gpu_reader = None
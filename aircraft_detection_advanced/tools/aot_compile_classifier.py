@@ -0,0 +1,51 @@
+"""
+Ahead-of-time compile the aircraft classifier with AOTInductor
+
+Produces models/<model_name>.aot.pt2 bound to a fixed
+(max_batch, 3, 224, 224) input shape. Worker processes that find the
+artifact load it in milliseconds instead of paying the torch.compile
+warmup on every spawn; AircraftClassifier pads short batches up to
+max_batch and slices the output.
+"""
+import argparse
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AOT-compile the aircraft classifier")
+    parser.add_argument("--model-name", default="efficientnet_b0", help="timm model name")
+    parser.add_argument("--num-classes", type=int, default=6, help="Number of output classes")
+    parser.add_argument("--checkpoint", default=None, help="Trained weights to bake in")
+    parser.add_argument("--device", default="cpu", help="Target device ('cpu' or 'cuda')")
+    parser.add_argument("--max-batch", type=int, default=32,
+                        help="Fixed batch size the artifact is bound to")
+    parser.add_argument("--output", default=None,
+                        help="Output path (default: models/<model_name>.aot.pt2)")
+    args = parser.parse_args()
+
+    import torch
+    import timm
+
+    model = timm.create_model(
+        args.model_name, pretrained=True, num_classes=args.num_classes
+    )
+    if args.checkpoint and Path(args.checkpoint).exists():
+        model.load_state_dict(torch.load(args.checkpoint, map_location=args.device))
+        print(f"Loaded checkpoint {args.checkpoint}")
+
+    model = model.to(args.device).eval()
+
+    output = Path(args.output or f"models/{args.model_name}.aot.pt2")
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    example = (torch.randn(args.max_batch, 3, 224, 224, device=args.device),)
+    exported = torch.export.export(model, example)
+    path = torch._inductor.aoti_compile_and_package(
+        exported, package_path=str(output)
+    )
+
+    print(f"✓ AOT artifact written to {path} (batch size {args.max_batch})")
+
+
+if __name__ == "__main__":
+    main()
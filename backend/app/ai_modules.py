@@ -5,6 +5,7 @@ Provides trajectory prediction, threat assessment, and environmental simulation
 
 import math
 import random
+import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 
@@ -24,23 +25,29 @@ class TrajectoryPredictor:
         Predict aircraft path for next N seconds
         Returns list of (lat, lon, time_offset) tuples
         """
-        predictions = []
-        
         # Convert speed from knots to degrees per second
         speed_deg_per_sec = groundspeed / 216000.0
-        
-        for t in range(0, time_horizon, 30):  # predict every 30 seconds
-            delta_lat = speed_deg_per_sec * math.cos(math.radians(track)) * t
-            delta_lon = speed_deg_per_sec * math.sin(math.radians(track)) * t / max(0.000001, math.cos(math.radians(latitude)))
-            
-            predictions.append({
-                "latitude": latitude + delta_lat,
-                "longitude": longitude + delta_lon,
-                "time_offset": t,
-                "timestamp": (datetime.utcnow() + timedelta(seconds=t)).isoformat()
-            })
-        
-        return predictions
+
+        # Evaluate the trig once and all steps as vector ops (every 30s)
+        t = np.arange(0, time_horizon, 30, dtype=np.float64)
+        heading_rad = math.radians(track)
+        delta_lat = speed_deg_per_sec * math.cos(heading_rad) * t
+        delta_lon = (
+            speed_deg_per_sec * math.sin(heading_rad) * t
+            / max(0.000001, math.cos(math.radians(latitude)))
+        )
+
+        now = datetime.utcnow()
+        return [
+            {
+                "latitude": latitude + dlat,
+                "longitude": longitude + dlon,
+                "time_offset": int(offset),
+                "timestamp": (now + timedelta(seconds=int(offset))).isoformat()
+            }
+            for dlat, dlon, offset
+            in zip(delta_lat.tolist(), delta_lon.tolist(), t.tolist())
+        ]
     
     @staticmethod
     def estimate_eta_to_point(
@@ -77,7 +84,14 @@ class ThreatAnalyzer:
         "military_classification": 10,
         "low_altitude": 10
     }
-    
+
+    # Classifications that add the military factor
+    MILITARY_CLASSES = ("fighter", "bomber", "military_drone", "military_heli", "stealth")
+
+    # Score thresholds -> level names (score >= 70 Critical, >= 50 High, >= 25 Medium)
+    _LEVEL_NAMES = np.array(["Low", "Medium", "High", "Critical"])
+    _LEVEL_BINS = np.array([25, 50, 70])
+
     @staticmethod
     def assess_threat(
         in_restricted_area: bool,
@@ -110,7 +124,7 @@ class ThreatAnalyzer:
             reasons.append(f"High speed: {groundspeed:.0f} kt")
         
         # Military classification
-        if classification in ["fighter", "bomber", "military_drone", "military_heli", "stealth"]:
+        if classification in ThreatAnalyzer.MILITARY_CLASSES:
             score += ThreatAnalyzer.WEIGHTS["military_classification"]
             reasons.append(f"Military classification: {classification}")
         
@@ -142,6 +156,52 @@ class ThreatAnalyzer:
             "confidence": min(100, score + 20)  # confidence percentage
         }
 
+    @staticmethod
+    def assess_threat_batch(
+        in_restricted_areas,
+        transponder_ids: List[Optional[str]],
+        classifications: List[str],
+        groundspeeds,
+        altitudes,
+        track_changes=None
+    ) -> Dict:
+        """
+        Vectorized threat scoring over arrays of aircraft
+
+        Same factors and thresholds as assess_threat, computed in one NumPy
+        pass. Returns a dict of arrays (level, score, confidence); the
+        reasons list is a per-aircraft rendering concern, so callers rebuild
+        it via assess_threat only for the aircraft they actually display.
+        """
+        in_restricted = np.asarray(in_restricted_areas, dtype=bool)
+        groundspeeds = np.asarray(groundspeeds, dtype=np.float64)
+        altitudes = np.asarray(altitudes, dtype=np.float64)
+        no_transponder = np.fromiter(
+            (not t or t == "UNKNOWN" for t in transponder_ids),
+            dtype=bool, count=len(transponder_ids)
+        )
+        is_military = np.isin(classifications, ThreatAnalyzer.MILITARY_CLASSES)
+
+        weights = ThreatAnalyzer.WEIGHTS
+        score = (
+            weights["in_restricted_zone"] * in_restricted
+            + weights["no_transponder"] * no_transponder
+            + weights["high_speed"] * (groundspeeds > 400)
+            + weights["military_classification"] * is_military
+            + weights["low_altitude"] * (in_restricted & (altitudes < 5000))
+        )
+        if track_changes is not None:
+            score = score + 5 * (np.asarray(track_changes) > 3)
+
+        levels = ThreatAnalyzer._LEVEL_NAMES[
+            np.digitize(score, ThreatAnalyzer._LEVEL_BINS)
+        ]
+        return {
+            "level": levels,
+            "score": score,
+            "confidence": np.minimum(100, score + 20)
+        }
+
 
 class EnvironmentalSimulator:
     """Simulates environmental conditions affecting detection"""
@@ -236,7 +296,11 @@ class EnvironmentalSimulator:
 
 class DetectionModel:
     """Simulates radar-based aircraft detection and classification"""
-    
+
+    # Shared generator for the batch path (seeding one per call is wasteful)
+    _rng = np.random.default_rng()
+
+
     @staticmethod
     def detect_aircraft(
         latitude: float,
@@ -283,6 +347,45 @@ class DetectionModel:
             "radar_cross_section": "normal"  # could be "small" for stealth
         }
     
+    @staticmethod
+    def detect_aircraft_batch(
+        latitudes,
+        longitudes,
+        altitudes,
+        groundspeeds,
+        radar_center_lat: float = 11.65,
+        radar_center_lon: float = 78.15,
+        max_range_km: float = 250
+    ) -> Dict:
+        """
+        Vectorized radar detection over arrays of aircraft
+
+        Same model as detect_aircraft, evaluated for every aircraft in one
+        NumPy pass. Returns a dict of arrays: detected (bool mask),
+        signal_strength, distance_km and confidence (zeros for aircraft
+        out of range).
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        altitudes = np.asarray(altitudes, dtype=np.float64)
+
+        dlat = (latitudes - radar_center_lat) * 111  # degrees to km
+        dlon = (longitudes - radar_center_lon) * 111 * np.cos(np.radians(latitudes))
+        distance_km = np.hypot(dlat, dlon)
+        in_range = distance_km <= max_range_km
+
+        base_strength = np.clip(1.0 - distance_km / max_range_km, 0.0, None)
+        altitude_factor = np.where(altitudes > 1000, 1.0, 0.5 + altitudes / 2000)
+        noise = DetectionModel._rng.uniform(0.85, 1.0, size=latitudes.shape)
+        signal_strength = np.where(in_range, base_strength * altitude_factor * noise, 0.0)
+
+        return {
+            "detected": in_range & (signal_strength > 0.2),
+            "signal_strength": signal_strength,
+            "distance_km": distance_km,
+            "confidence": np.minimum(100, signal_strength * 120)
+        }
+
     @staticmethod
     def classify_aircraft_type(
         altitude: float,